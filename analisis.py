@@ -1,7 +1,16 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 from data_exporter import export_powerbi_ready_data
 from data_cleaner import clean_and_prepare_data
+from data_loader import load_data_typed
+from data_cache import load_clean_data_cached
+from profile_store import ProfileStore
+from profile_summary import summarize_profiles
+from pipeline_runner import PipelineRunner
+from fleet_analysis import run_fleet_analysis
+import instrumentation
 from data_analyzer import analyze_descriptive_statistics, analyze_profile_ids, analyze_correlations
 from data_visualizer import (
     plot_and_summarize_temperature_trends,
@@ -13,12 +22,16 @@ from data_visualizer import (
 FILE_NAME = 'Electric_Motor_Temperature.csv'
 FILE_PATH = FILE_NAME
 
-def load_data(file_path: str) -> pd.DataFrame:
+def load_data(file_path: str, columns: list = None) -> pd.DataFrame:
     """
-    cargar datos desde un archivo csv.
+    cargar datos desde un archivo csv con el esquema tipado del motor.
+
+    args:
+        file_path (str): ruta del archivo csv.
+        columns (list): columnas a leer; None para leer todas.
     """
     try:
-        df = pd.read_csv(file_path) # leer archivo csv
+        df = load_data_typed(file_path, columns=columns) # leer archivo csv con tipos compactos
         print(f"dataset '{file_path}' cargar exitosamente.") 
         return df # devolver dataframe
     except FileNotFoundError:
@@ -30,6 +43,25 @@ def load_data(file_path: str) -> pd.DataFrame:
         print(f"ocurrir un error al cargar el dataset: {e}")
         return None # devolver nulo en caso de error
 
+def load_clean_data(file_path: str, use_cache: bool = True) -> pd.DataFrame:
+    """
+    obtener dataset limpio, reutilizando la cache en disco si el archivo no cambio.
+
+    args:
+        file_path (str): ruta del archivo csv.
+        use_cache (bool): usar cache de datos limpios; False para limpiar siempre.
+    """
+    if not use_cache:
+        return clean_and_prepare_data(load_data(file_path)) # cargar y limpiar sin cache
+    if not os.path.exists(file_path):
+        print(f"error: el archivo '{file_path}' no encontrar. asegurar que este en la misma carpeta o revisar la ruta.")
+        return None
+    try:
+        return load_clean_data_cached(file_path) # abrir cache o construirla
+    except Exception as e:
+        print(f"ocurrir un error al preparar el dataset limpio: {e}")
+        return None
+
 def inspect_data(df: pd.DataFrame):
     """
     inspeccionar estructura y contenido de dataframe.
@@ -47,22 +79,53 @@ def inspect_data(df: pd.DataFrame):
     print("\n--- ultimas 5 filas del dataframe (despues de la limpieza) ---")
     print(df.tail()) # mostrar ultimas filas
 
-# --- ejecucion principal ---
-if __name__ == "__main__":
-    df_motor = load_data(FILE_PATH) # cargar datos del motor
-    if df_motor is not None: # verificar si datos fueron cargados
-        df_motor_cleaned = clean_and_prepare_data(df_motor) # limpiar y preparar datos
-        if df_motor_cleaned is not None: # verificar si datos fueron limpiados
-            inspect_data(df_motor_cleaned) # inspeccionar datos limpios
-            analyze_descriptive_statistics(df_motor_cleaned) # analizar estadisticas descriptivas
-            analyze_profile_ids(df_motor_cleaned) # analizar ids de perfil
+def build_analysis_pipeline(file_path: str, profiles_to_visualize: list,
+                            export_path: str = 'motor_data_powerbi_ready.csv') -> PipelineRunner:
+    """
+    describir las etapas del analisis y sus dependencias como un grafo memorizado.
 
-            profiles_to_visualize = [11.0, 29.0, 6.0] # definir perfiles a visualizar
-            plot_and_summarize_temperature_trends(df_motor_cleaned, profiles_to_visualize) # graficar tendencias de temperatura
-            plot_and_summarize_operational_trends(df_motor_cleaned, profiles_to_visualize) # graficar tendencias operacionales
+    args:
+        file_path (str): ruta del archivo csv.
+        profiles_to_visualize (list): profile_id a graficar.
+        export_path (str): archivo de salida para power bi.
 
-            analyze_correlations(df_motor_cleaned) # analizar correlaciones (mostrar matriz textual)
+    returns:
+        PipelineRunner: pipeline listo para ejecutar.
+    """
+    runner = PipelineRunner()
+    # los datos limpios ya tienen su propia cache en disco, no se memorizan otra vez
+    runner.add_stage('datos', load_clean_data, params={'file_path': file_path}, sources=[file_path], memoize=False)
+    # la cache ya agrupa las sesiones: sin ordenar no se copia el dataset mapeado en memoria
+    runner.add_stage('sesiones', ProfileStore.from_dataframe, inputs=['datos'], params={'sort': False}, memoize=False)
+    runner.add_stage('inspeccion', inspect_data, inputs=['datos'])
+    runner.add_stage('estadisticas', analyze_descriptive_statistics, inputs=['sesiones'])
+    runner.add_stage('resumen_sesiones', summarize_profiles, inputs=['sesiones'])
+    runner.add_stage('duraciones', analyze_profile_ids, inputs={'df': 'sesiones', 'summary': 'resumen_sesiones'})
+    runner.add_stage('correlacion', analyze_correlations, inputs=['sesiones'])
+    # los graficos abren ventanas: se ejecutan siempre y en el hilo principal
+    runner.add_stage('graficos_temperatura', plot_and_summarize_temperature_trends,
+                     inputs={'df': 'sesiones', 'summary': 'resumen_sesiones'},
+                     params={'profile_ids_to_plot': profiles_to_visualize}, memoize=False, main_thread=True)
+    runner.add_stage('graficos_operacionales', plot_and_summarize_operational_trends,
+                     inputs={'df': 'sesiones', 'summary': 'resumen_sesiones'},
+                     params={'profile_ids_to_plot': profiles_to_visualize}, memoize=False, main_thread=True)
+    runner.add_stage('mapa_calor', plot_and_summarize_correlation_heatmap,
+                     inputs={'df': 'sesiones', 'correlation_matrix': 'correlacion'}, memoize=False, main_thread=True)
+    # la exportacion escribe un archivo: se ejecuta siempre para no dejar la salida sin crear
+    runner.add_stage('exportacion', export_powerbi_ready_data, inputs=['sesiones'], params={'file_path': export_path},
+                     memoize=False)
+    return runner
 
-            #generar el mapa de calor de correlacion
-            plot_and_summarize_correlation_heatmap(df_motor_cleaned) # graficar mapa de calor de correlacion
-            export_powerbi_ready_data(df_motor_cleaned, file_path='motor_data_powerbi_ready.csv') # exportar datos para powerbi
\ No newline at end of file
+# --- ejecucion principal ---
+if __name__ == "__main__":
+    profiles_to_visualize = [11.0, 29.0, 6.0] # definir perfiles a visualizar
+    if len(sys.argv) > 1: # modo flota: python analisis.py <carpeta o patron de csv>
+        run_fleet_analysis(sys.argv[1:], export_dir='powerbi_flota')
+    elif os.path.exists(FILE_PATH): # verificar si el archivo existe antes de armar el pipeline
+        pipeline = build_analysis_pipeline(FILE_PATH, profiles_to_visualize) # describir etapas del analisis
+        pipeline.run() # ejecutar solo etapas invalidas, en paralelo cuando sean independientes
+        if instrumentation.is_enabled(): # activar con MOTOR_PROFILING=1
+            instrumentation.print_report() # mostrar tiempos y memoria por etapa
+            print(f"traza de instrumentacion guardar en '{instrumentation.write_report()}'.")
+    else:
+        print(f"error: el archivo '{FILE_PATH}' no encontrar. asegurar que este en la misma carpeta o revisar la ruta.")
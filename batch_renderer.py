@@ -0,0 +1,248 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from profile_store import as_profile_store
+from correlation_engine import compute_correlation_matrix
+
+# --- configuracion de figuras (mismos estilos que data_visualizer) ---
+FIGSIZE = (12, 6)
+HEATMAP_FIGSIZE = (14, 10)
+DPI = 100
+TEMPERATURE_SERIES = [
+    ('pm', 'temperatura_rotor (pm)', 'red', '-'),
+    ('stator_winding', 'temperatura_devanado_estator', 'blue', '-'),
+    ('stator_tooth', 'temperatura_diente_estator', 'green', '-'),
+    ('stator_yoke', 'temperatura_yugo_estator', 'purple', '-'),
+    ('coolant', 'temperatura_refrigerante', 'cyan', '-'),
+    ('ambient', 'temperatura_ambiente', 'gray', '-'),
+]
+SPEED_TORQUE_SERIES = [
+    ('motor_speed', 'velocidad del motor (rpm)', 'orange', '-'),
+    ('torque', 'torque (nm)', 'brown', '--'),
+]
+CURRENT_VOLTAGE_SERIES = [
+    ('i_d', 'corriente i_d', 'darkgreen', '-'),
+    ('i_q', 'corriente i_q', 'darkblue', '-'),
+    ('u_d', 'voltaje u_d', 'red', ':'),
+    ('u_q', 'voltaje u_q', 'purple', ':'),
+]
+# (nombre de archivo, titulo, etiqueta eje y, series)
+PROFILE_FIGURES = [
+    ('temperatura', 'tendencias de temperatura para profile id: {}', 'temperatura (°c)', TEMPERATURE_SERIES),
+    ('velocidad_torque', 'velocidad y torque del motor para profile id: {}', 'valor', SPEED_TORQUE_SERIES),
+    ('corrientes_voltajes', 'corrientes y voltajes de control para profile id: {}', 'valor', CURRENT_VOLTAGE_SERIES),
+]
+
+
+def pixel_budget(figsize: tuple = FIGSIZE, dpi: int = DPI) -> int:
+    """
+    numero de puntos por serie que aporta detalle visible: dos (min y max) por pixel de ancho.
+    """
+    return 2 * int(figsize[0] * dpi)
+
+
+def _bucket_starts(n: int, n_buckets: int) -> np.ndarray:
+    """
+    posiciones de inicio de cubetas de tamaño casi igual.
+    """
+    return np.unique(np.linspace(0, n, n_buckets + 1, dtype=np.int64)[:-1])
+
+
+def _first_position(values: np.ndarray, extremes: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    primera posicion de cada cubeta donde se alcanza su extremo.
+    """
+    sizes = np.diff(np.append(starts, len(values)))
+    hits = values == np.repeat(extremes, sizes)
+    return np.minimum.reduceat(np.where(hits, np.arange(len(values)), len(values)), starts)
+
+
+def downsample_minmax(x: np.ndarray, y: np.ndarray, n_points: int):
+    """
+    reducir serie conservando el minimo y el maximo de cada cubeta (sin perder picos).
+
+    args:
+        x (np.ndarray): eje x ordenado.
+        y (np.ndarray): valores de la serie.
+        n_points (int): numero maximo de puntos de salida.
+
+    returns:
+        tuple: (x reducido, y reducido).
+    """
+    n = len(y)
+    if n <= n_points or n_points < 2:
+        return x, y
+    starts = _bucket_starts(n, n_points // 2)
+    lows = _first_position(y, np.minimum.reduceat(y, starts), starts)
+    highs = _first_position(y, np.maximum.reduceat(y, starts), starts)
+    keep = np.unique(np.concatenate([lows, highs])) # ordenar y quitar duplicados
+    return x[keep], y[keep]
+
+
+def downsample_lttb(x: np.ndarray, y: np.ndarray, n_points: int):
+    """
+    reducir serie con largest-triangle-three-buckets (conserva la forma visual).
+
+    args:
+        x (np.ndarray): eje x ordenado.
+        y (np.ndarray): valores de la serie.
+        n_points (int): numero de puntos de salida (incluye primero y ultimo).
+
+    returns:
+        tuple: (x reducido, y reducido).
+    """
+    n = len(y)
+    if n <= n_points or n_points < 3:
+        return x, y
+    x64 = np.asarray(x, dtype=np.float64)
+    y64 = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_points - 1, dtype=np.int64) # cubetas interiores
+    keep = np.empty(n_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    selected = 0
+    for i in range(n_points - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        # promedio de la cubeta siguiente como tercer vertice del triangulo
+        avg_x = x64[stop:next_stop].mean() if next_stop > stop else x64[-1]
+        avg_y = y64[stop:next_stop].mean() if next_stop > stop else y64[-1]
+        ax, ay = x64[selected], y64[selected]
+        areas = np.abs((ax - avg_x) * (y64[start:stop] - ay) - (ax - x64[start:stop]) * (avg_y - ay))
+        selected = start + int(np.argmax(areas))
+        keep[i + 1] = selected
+    return x[keep], y[keep]
+
+
+DOWNSAMPLERS = {'minmax': downsample_minmax, 'lttb': downsample_lttb}
+
+
+def _render_series_figure(task: tuple) -> str:
+    """
+    dibujar una figura de lineas en un canvas agg (sin ventana) y guardarla en disco.
+    """
+    output_path, title, ylabel, lines = task
+    fig = Figure(figsize=FIGSIZE, dpi=DPI)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    for x, y, label, color, linestyle in lines: # graficar cada serie ya reducida
+        ax.plot(x, y, label=label, color=color, linestyle=linestyle, linewidth=1)
+    ax.set_title(title)
+    ax.set_xlabel('tiempo (segundos)')
+    ax.set_ylabel(ylabel)
+    ax.grid(True)
+    ax.legend(loc='upper left', bbox_to_anchor=(1, 1))
+    fig.tight_layout()
+    fig.savefig(output_path)
+    return output_path
+
+
+def _render_heatmap_figure(output_path: str, correlation_matrix) -> str:
+    """
+    dibujar mapa de calor de correlacion en un canvas agg y guardarlo en disco.
+    """
+    import seaborn as sns # seaborn solo se necesita para el mapa de calor
+
+    fig = Figure(figsize=HEATMAP_FIGSIZE, dpi=DPI)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    mask = np.triu(np.ones_like(correlation_matrix, dtype=bool)) # ocultar triangulo superior
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', fmt=".2f",
+                linewidths=.5, mask=mask, cbar_kws={"shrink": .8}, ax=ax)
+    ax.set_title('mapa de calor de la matriz de correlacion')
+    ax.tick_params(axis='x', labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+    fig.tight_layout()
+    fig.savefig(output_path)
+    return output_path
+
+
+def _build_profile_tasks(store, profile_ids, output_dir, fmt, max_points, method):
+    """
+    preparar tareas de dibujo con las series ya reducidas (carga pequeña para los procesos).
+    """
+    downsample = DOWNSAMPLERS[method]
+    tasks = []
+    for profile_id in profile_ids:
+        df_profile = store.get(profile_id)
+        if df_profile.empty:
+            print(f"advertencia: no encontrar datos para el profile_id {profile_id}. saltar.")
+            continue
+        time_values = df_profile['Tiempo_Segundos'].to_numpy()
+        for name, title, ylabel, series in PROFILE_FIGURES:
+            lines = []
+            for col, label, color, linestyle in series:
+                x, y = downsample(time_values, df_profile[col].to_numpy(), max_points)
+                lines.append((x, y, label, color, linestyle))
+            output_path = os.path.join(output_dir, f'profile_{profile_id}_{name}.{fmt}')
+            tasks.append((output_path, title.format(profile_id), ylabel, lines))
+    return tasks
+
+
+def render_profile_plots(data, profile_ids: list = None, output_dir: str = 'figuras', fmt: str = 'png',
+                         workers: int = None, max_points: int = None, method: str = 'minmax',
+                         correlation_matrix=None, include_heatmap: bool = True) -> list:
+    """
+    dibujar graficos de temperatura, operacion y mapa de calor directamente a archivos.
+
+    no abre ventanas: cada figura se dibuja en un canvas agg y las figuras se reparten entre
+    varios procesos. cada serie se reduce antes a un numero de puntos acorde al ancho en pixeles.
+
+    args:
+        data (pd.DataFrame | ProfileStore): datos limpios con columna 'Tiempo_Segundos'.
+        profile_ids (list): sesiones a dibujar; None para todas.
+        output_dir (str): carpeta de salida.
+        fmt (str): formato de imagen, por ejemplo 'png' o 'svg'.
+        workers (int): numero de procesos; None para usar todos los nucleos, 1 para no usar procesos.
+        max_points (int): puntos por serie; None para usar el presupuesto de pixeles.
+        method (str): metodo de reduccion, 'minmax' o 'lttb'.
+        correlation_matrix (pd.DataFrame): matriz para el mapa de calor; None para calcularla.
+        include_heatmap (bool): dibujar tambien el mapa de calor.
+
+    returns:
+        list: rutas de los archivos generados.
+    """
+    if data is None:
+        print("no poder generar visualizaciones, el dataframe es nulo.")
+        return []
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"metodo de reduccion desconocido: {method}. usar 'minmax' o 'lttb'.")
+
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    store = as_profile_store(data)
+    profile_ids = store.profile_ids.tolist() if profile_ids is None else profile_ids
+    max_points = pixel_budget() if max_points is None else max_points
+    tasks = _build_profile_tasks(store, profile_ids, output_dir, fmt, max_points, method)
+
+    if workers == 1:
+        written = [_render_series_figure(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool: # repartir figuras entre nucleos
+            written = list(pool.map(_render_series_figure, tasks, chunksize=max(1, len(tasks) // 64)))
+
+    if include_heatmap:
+        if correlation_matrix is None:
+            correlation_matrix = compute_correlation_matrix(store)
+        written.append(_render_heatmap_figure(os.path.join(output_dir, f'mapa_calor_correlacion.{fmt}'),
+                                              correlation_matrix))
+
+    elapsed = time.perf_counter() - start
+    print(f"generar {len(written)} figuras en '{output_dir}' en {elapsed:.2f} s.")
+    return written
+
+
+# --- ejecucion por lotes en servidores sin pantalla ---
+if __name__ == "__main__":
+    from analisis import FILE_PATH, load_clean_data
+
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else 'figuras' # carpeta de salida opcional
+    df_motor_cleaned = load_clean_data(FILE_PATH) # cargar datos limpios (desde cache si existe)
+    if df_motor_cleaned is not None:
+        render_profile_plots(df_motor_cleaned, output_dir=output_dir) # dibujar todas las sesiones
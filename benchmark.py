@@ -0,0 +1,309 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from synthetic_data import write_synthetic_csv
+from data_loader import load_data_typed, load_data_chunks
+from data_cleaner import clean_and_prepare_data, clean_and_prepare_chunks
+from profile_store import ProfileStore
+from profile_summary import summarize_profiles
+from correlation_engine import compute_correlation_matrix
+from data_rollup import build_rollup_pyramid
+from data_exporter import export_powerbi_stream
+
+try:
+    import resource
+except ImportError:  # resource solo existe en unix; sin el ni /proc no se mide el pico de rss
+    resource = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow es opcional, sin el no hay memoria de arrow que medir
+    pa = None
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_OUTPUT = 'benchmark_results.json'
+DEFAULT_TOLERANCE = 0.20 # 20% mas lento que la referencia se considera regresion
+DEFAULT_MIN_SECONDS = 0.05 # diferencias menores se consideran ruido de medicion
+MEMORY_METRICS = ('peak_memory_bytes', 'arrow_peak_growth_bytes', 'peak_rss_growth_bytes')
+# etapas cuyo resultado usan etapas posteriores; al medir una etapa aislada solo se repiten estas
+_PREREQUISITE_STAGES = ('cargar', 'limpiar', 'indexar_sesiones')
+
+
+def measure(func, *args, track_memory: bool = True, **kwargs):
+    """
+    ejecutar una funcion midiendo tiempo de reloj, tiempo de cpu y pico de memoria.
+
+    tracemalloc frena mucho a las funciones con muchas asignaciones pequeñas (por ejemplo
+    to_csv), asi que los tiempos se toman en una ejecucion sin trazar y el pico de memoria en
+    una segunda ejecucion trazada. la memoria de arrow y la de extensiones en c que no pasa por
+    tracemalloc la mide measure_isolated. la salida de texto de la funcion se descarta.
+
+    returns:
+        tuple: (resultado, dict con seconds, cpu_seconds y peak_memory_bytes).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        result = func(*args, **kwargs)
+        record = {
+            'seconds': time.perf_counter() - start_wall,
+            'cpu_seconds': time.process_time() - start_cpu,
+            'peak_memory_bytes': None,
+        }
+        if track_memory:
+            del result # no contar el resultado de la primera ejecucion como memoria base
+            tracemalloc.start()
+            result = func(*args, **kwargs)
+            record['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return result, record
+
+
+def _rss_bytes():
+    """
+    pico de memoria residente del proceso: VmHWM en linux (exec lo reinicia, a diferencia de
+    ru_maxrss, que hereda el pico del proceso padre) o ru_maxrss (kb, bytes en macos).
+    """
+    try:
+        with open('/proc/self/status', encoding='ascii') as handle:
+            for line in handle:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if platform.system() == 'Darwin' else peak * 1024
+
+
+def _reset_rss_peak():
+    """
+    bajar el pico de rss al uso actual donde linux lo permite, para medir solo lo que sigue.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as handle:
+            handle.write('5')
+    except OSError: # otro sistema: queda el pico de preparar las entradas
+        pass
+
+
+def _consume(iterator) -> int:
+    """
+    recorrer un iterador de bloques y contar filas.
+    """
+    return sum(len(chunk) for chunk in iterator)
+
+
+def _run_stages(n_rows: int, workdir: str, seed: int, run):
+    """
+    recorrer las etapas del benchmark pasando cada una por run(stage, func, *args, **kwargs).
+    """
+    csv_path = os.path.join(workdir, f'motor_sintetico_{n_rows}.csv')
+    run('generar_csv', write_synthetic_csv, csv_path, n_rows, null_fraction=1e-5, seed=seed)
+    df = run('cargar', load_data_typed, csv_path)
+    run('cargar_limpiar_bloques', lambda: _consume(clean_and_prepare_chunks(load_data_chunks(csv_path))))
+    df_cleaned = run('limpiar', clean_and_prepare_data, df)
+    del df
+    store = run('indexar_sesiones', ProfileStore.from_dataframe, df_cleaned)
+    run('estadisticas_describe', lambda: store.data.describe())
+    run('resumen_sesiones', summarize_profiles, store)
+    run('correlacion', compute_correlation_matrix, store)
+    run('agregados', build_rollup_pyramid, store)
+    run('exportar_csv', export_powerbi_stream, store, os.path.join(workdir, 'export.csv'))
+    if pa is not None:
+        run('exportar_parquet', export_powerbi_stream, store, os.path.join(workdir, 'export_parquet'))
+    else:
+        print("  exportar_parquet omitir: pyarrow no instalado.")
+
+
+class _StageDone(Exception):
+    """
+    cortar el recorrido de etapas despues de medir la etapa aislada.
+    """
+
+
+def _isolated_stage_memory(n_rows: int, workdir: str, seed: int, target: str) -> dict:
+    """
+    en un proceso nuevo, preparar las entradas de una etapa y medir la memoria que agrega.
+    """
+    measured = {}
+
+    def run(stage, func, *args, **kwargs):
+        if stage != target:
+            if stage not in _PREREQUISITE_STAGES:
+                return None # el csv ya existe y el resto de resultados no se usa
+            with contextlib.redirect_stdout(io.StringIO()):
+                return func(*args, **kwargs)
+        pool = pa.default_memory_pool() if pa is not None else None
+        arrow_start = (pool.max_memory() or 0) if pool is not None else 0
+        _reset_rss_peak()
+        rss_start = _rss_bytes()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(*args, **kwargs)
+        # el pico de arrow no se reinicia: para ambos se reporta cuanto subio el pico con la etapa
+        rss_peak = _rss_bytes()
+        measured['peak_rss_growth_bytes'] = rss_peak - rss_start if rss_peak is not None else None
+        measured['arrow_peak_growth_bytes'] = max((pool.max_memory() or 0) - arrow_start, 0) if pool is not None else None
+        raise _StageDone()
+
+    try:
+        _run_stages(n_rows, workdir, seed, run)
+    except _StageDone:
+        pass
+    return measured
+
+
+def measure_isolated(n_rows: int, workdir: str, stage: str, seed: int = 0) -> dict:
+    """
+    medir en un proceso nuevo el aumento del pico de rss y del pool de arrow de una etapa.
+
+    el proceso repite sin medir solo las etapas cuyo resultado necesita la etapa medida, asi
+    que el aumento del pico corresponde a la etapa sin restos de etapas anteriores que no usa.
+
+    args:
+        n_rows (int): filas del dataset sintetico (el csv ya debe existir en workdir).
+        workdir (str): carpeta de trabajo del benchmark.
+        stage (str): etapa a medir.
+        seed (int): semilla del generador.
+
+    returns:
+        dict: peak_rss_growth_bytes y arrow_peak_growth_bytes (None si no se pueden medir).
+    """
+    # spawn: proceso limpio, sin heredar la memoria ya tocada por el proceso del benchmark
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(_isolated_stage_memory, n_rows, workdir, seed, stage).result()
+
+
+def benchmark_size(n_rows: int, workdir: str, seed: int = 0, track_memory: bool = True) -> list:
+    """
+    medir cada etapa del pipeline sobre un csv sintetico de n_rows filas.
+
+    args:
+        n_rows (int): filas del dataset sintetico.
+        workdir (str): carpeta temporal para archivos de entrada y salida.
+        seed (int): semilla del generador.
+        track_memory (bool): medir memoria: tracemalloc en una segunda ejecucion y rss y arrow
+            en un proceso nuevo por etapa.
+
+    returns:
+        list: un registro por etapa.
+    """
+    records = []
+
+    def run(stage, func, *args, **kwargs):
+        result, record = measure(func, *args, track_memory=track_memory, **kwargs)
+        record.update({'rows': n_rows, 'stage': stage})
+        record['rows_per_second'] = n_rows / record['seconds'] if record['seconds'] > 0 else float('inf')
+        if track_memory:
+            record.update(measure_isolated(n_rows, workdir, stage, seed=seed))
+        records.append(record)
+        print(f"  {stage:<24} {record['seconds']:8.3f} s" + ''.join(
+            f"  {label} {record[metric] / 1e6:8.1f} mb"
+            for label, metric in zip(('tracemalloc', 'arrow', 'rss'), MEMORY_METRICS)
+            if record.get(metric) is not None))
+        return result
+
+    print(f"\n--- benchmark con {n_rows} filas ---")
+    _run_stages(n_rows, workdir, seed, run)
+    return records
+
+
+def run_benchmark(sizes: tuple = DEFAULT_SIZES, output_path: str = DEFAULT_OUTPUT, seed: int = 0,
+                  track_memory: bool = True) -> dict:
+    """
+    ejecutar el benchmark en varios tamaños y guardar los resultados en json.
+
+    args:
+        sizes (tuple): numero de filas de cada corrida.
+        output_path (str): archivo json de resultados.
+        seed (int): semilla del generador.
+        track_memory (bool): medir memoria de cada etapa (tracemalloc, arrow y rss).
+
+    returns:
+        dict: metadatos del entorno y registros por etapa.
+    """
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'seed': seed,
+        'records': [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_rows in sizes:
+            results['records'].extend(benchmark_size(n_rows, workdir, seed=seed, track_memory=track_memory))
+
+    with open(output_path, 'w', encoding='utf-8') as handle:
+        json.dump(results, handle, indent=2)
+    print(f"\nresultados del benchmark guardar en '{output_path}'.")
+    return results
+
+
+def compare_benchmarks(baseline_path: str, current_path: str, tolerance: float = DEFAULT_TOLERANCE,
+                       min_seconds: float = DEFAULT_MIN_SECONDS) -> list:
+    """
+    comparar dos archivos de resultados y listar etapas que empeoraron mas que la tolerancia.
+
+    args:
+        baseline_path (str): resultados de referencia.
+        current_path (str): resultados nuevos.
+        tolerance (float): aumento relativo permitido en tiempo y memoria.
+        min_seconds (float): aumento absoluto de tiempo por debajo del cual no se reporta.
+
+    returns:
+        list: regresiones encontradas (etapa, filas, metrica, referencia, actual).
+    """
+    with open(baseline_path, encoding='utf-8') as handle:
+        baseline = {(r['stage'], r['rows']): r for r in json.load(handle)['records']}
+    with open(current_path, encoding='utf-8') as handle:
+        current = json.load(handle)['records']
+
+    regressions = []
+    print(f"\n--- comparar '{current_path}' con '{baseline_path}' ---")
+    for record in current:
+        reference = baseline.get((record['stage'], record['rows']))
+        if reference is None:
+            continue
+        for metric in ('seconds',) + MEMORY_METRICS:
+            if not reference.get(metric) or record.get(metric) is None: # resultados anteriores sin la metrica
+                continue
+            if metric == 'seconds' and record[metric] - reference[metric] < min_seconds:
+                continue
+            if record[metric] > reference[metric] * (1 + tolerance):
+                regressions.append((record['stage'], record['rows'], metric, reference[metric], record[metric]))
+                print(f"  regresion: {record['stage']} ({record['rows']} filas) {metric}: "
+                      f"{reference[metric]:.4g} -> {record[metric]:.4g}")
+    if not regressions:
+        print("  no encontrar regresiones.")
+    return regressions
+
+
+# --- ejecucion desde linea de comandos ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='benchmark del pipeline con datos sinteticos del motor.')
+    parser.add_argument('sizes', nargs='*', type=int, default=list(DEFAULT_SIZES), help='filas de cada corrida')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='archivo json de resultados')
+    parser.add_argument('--compare', help='resultados de referencia para detectar regresiones')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='aumento relativo permitido')
+    parser.add_argument('--seed', type=int, default=0, help='semilla del generador')
+    parser.add_argument('--no-memory', action='store_true', help='no medir memoria (una sola ejecucion por etapa, sin procesos aislados)')
+    args = parser.parse_args()
+
+    run_benchmark(tuple(args.sizes), args.output, seed=args.seed, track_memory=not args.no_memory)
+    if args.compare:
+        compare_benchmarks(args.compare, args.output, args.tolerance)
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from synthetic_data import write_synthetic_csv
+
+SYNTHETIC_ROWS = 120_000 # ~6 sesiones, suficiente para cruzar limites de bloque
+SYNTHETIC_NULL_FRACTION = 1e-3
+
+
+@pytest.fixture(scope='session')
+def synthetic_csv(tmp_path_factory):
+    """
+    csv sintetico con varias sesiones y algunos nulos, compartido por todas las pruebas.
+    """
+    path = tmp_path_factory.mktemp('datos') / 'motor_sintetico.csv'
+    write_synthetic_csv(str(path), SYNTHETIC_ROWS, null_fraction=SYNTHETIC_NULL_FRACTION, seed=0)
+    return str(path)
+
+
+@pytest.fixture(scope='session')
+def reference_clean(synthetic_csv):
+    """
+    dataset limpio por el camino original de pandas: read_csv, dropna y contador por sesion.
+    """
+    df = pd.read_csv(synthetic_csv).dropna()
+    df['Tiempo_Segundos'] = df.groupby('profile_id').cumcount() / 2
+    return df
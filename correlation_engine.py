@@ -0,0 +1,175 @@
+import pandas as pd
+import numpy as np
+
+from profile_store import DEFAULT_BATCH_ROWS, as_dataframe, as_profile_store, fold_accumulators, iter_batches
+from instrumentation import instrumented
+
+# columnas de identificacion y tiempo que no entran en la correlacion
+CORRELATION_EXCLUDED = ['profile_id', 'Tiempo_Segundos']
+
+
+class CorrelationAccumulator:
+    """
+    acumulador de medias y co-momentos para covarianza y correlacion en streaming.
+
+    usa la actualizacion por lotes de chan/welford: cada lote aporta su media y su matriz
+    de co-momentos centrados, y dos acumuladores se combinan de forma exacta, por lo que
+    los resultados parciales de bloques, sesiones o procesos se pueden unir en cualquier orden.
+    """
+
+    def __init__(self, columns: list):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = 0 # filas acumuladas
+        self.mean = np.zeros(k) # media de cada columna
+        self.comoment = np.zeros((k, k)) # suma de productos de desviaciones respecto a la media
+
+    def update(self, values) -> 'CorrelationAccumulator':
+        """
+        agregar un lote de filas.
+
+        args:
+            values (pd.DataFrame | np.ndarray): lote con las columnas del acumulador.
+
+        returns:
+            CorrelationAccumulator: el mismo acumulador, para encadenar llamadas.
+        """
+        if isinstance(values, pd.DataFrame):
+            values = values[self.columns].to_numpy(dtype=np.float64)
+        else:
+            values = np.asarray(values, dtype=np.float64)
+        n_batch = values.shape[0]
+        if n_batch == 0:
+            return self
+        batch_mean = values.mean(axis=0)
+        centered = values - batch_mean
+        batch = CorrelationAccumulator(self.columns)
+        batch.n, batch.mean, batch.comoment = n_batch, batch_mean, centered.T @ centered
+        return self.merge(batch)
+
+    def merge(self, other: 'CorrelationAccumulator') -> 'CorrelationAccumulator':
+        """
+        combinar otro acumulador con las mismas columnas (resultado exacto).
+
+        args:
+            other (CorrelationAccumulator): acumulador parcial de otro bloque o proceso.
+
+        returns:
+            CorrelationAccumulator: el mismo acumulador, para encadenar llamadas.
+        """
+        if other.columns != self.columns:
+            raise ValueError("no poder combinar acumuladores con columnas distintas.")
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.comoment = other.n, other.mean.copy(), other.comoment.copy()
+            return self
+        n_total = self.n + other.n
+        delta = other.mean - self.mean
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * (self.n * other.n / n_total)
+        self.mean = self.mean + delta * (other.n / n_total)
+        self.n = n_total
+        return self
+
+    def subtract(self, other: 'CorrelationAccumulator') -> 'CorrelationAccumulator':
+        """
+        quitar un acumulador parcial contenido en este (inverso de merge).
+
+        permite obtener el resultado de "todo menos una sesion" sin volver a leer los datos.
+
+        args:
+            other (CorrelationAccumulator): acumulador de filas ya combinadas en este.
+
+        returns:
+            CorrelationAccumulator: nuevo acumulador con las filas restantes.
+        """
+        if other.columns != self.columns:
+            raise ValueError("no poder restar acumuladores con columnas distintas.")
+        if other.n > self.n:
+            raise ValueError("no poder restar un acumulador con mas filas que el total.")
+        rest = CorrelationAccumulator(self.columns)
+        rest.n = self.n - other.n
+        if rest.n == 0:
+            return rest
+        rest.mean = (self.mean * self.n - other.mean * other.n) / rest.n
+        delta = other.mean - rest.mean
+        rest.comoment = self.comoment - other.comoment - np.outer(delta, delta) * (rest.n * other.n / self.n)
+        return rest
+
+    def covariance(self, ddof: int = 1) -> pd.DataFrame:
+        """
+        devolver matriz de covarianza (ddof=1 como pandas.cov).
+        """
+        denom = self.n - ddof
+        values = self.comoment / denom if denom > 0 else np.full_like(self.comoment, np.nan)
+        return pd.DataFrame(values, index=self.columns, columns=self.columns)
+
+    def correlation(self) -> pd.DataFrame:
+        """
+        devolver matriz de correlacion de pearson (columnas constantes dan nan, como pandas.corr).
+        """
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = self.comoment / np.outer(std, std)
+        values = np.clip(values, -1.0, 1.0)
+        np.fill_diagonal(values, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(values, index=self.columns, columns=self.columns)
+
+
+def correlation_columns(df: pd.DataFrame) -> list:
+    """
+    columnas numericas que participan en la correlacion.
+    """
+    return [col for col in df.columns if col not in CORRELATION_EXCLUDED]
+
+
+@instrumented('acumular_correlaciones')
+def accumulate_correlations(data, columns: list = None, by_profile: bool = False,
+                            batch_rows: int = DEFAULT_BATCH_ROWS):
+    """
+    recorrer los datos una sola vez y acumular estadisticos de correlacion.
+
+    args:
+        data (pd.DataFrame | ProfileStore): datos limpios.
+        columns (list): columnas a correlacionar; None para todas las de sensores.
+        by_profile (bool): acumular tambien un resultado por sesion.
+        batch_rows (int): filas por lote al recorrer un dataframe sin indice de sesiones.
+
+    returns:
+        tuple: (acumulador global, dict de acumuladores por profile_id o None).
+    """
+    df = as_dataframe(data)
+    columns = correlation_columns(df) if columns is None else list(columns)
+    # lotes acotados para no duplicar el dataset en float64; por sesion, una pasada sobre el indice
+    chunks = [as_profile_store(data)] if by_profile else iter_batches(df, batch_rows)
+    return fold_accumulators(chunks, lambda: CorrelationAccumulator(columns), by_profile)
+
+
+def compute_correlation_matrix(data, columns: list = None) -> pd.DataFrame:
+    """
+    calcular matriz de correlacion global equivalente a pandas.corr.
+
+    args:
+        data (pd.DataFrame | ProfileStore): datos limpios.
+        columns (list): columnas a correlacionar; None para todas las de sensores.
+
+    returns:
+        pd.DataFrame: matriz de correlacion.
+    """
+    total, _ = accumulate_correlations(data, columns=columns)
+    return total.correlation()
+
+
+def compute_profile_correlations(data, columns: list = None):
+    """
+    calcular en una sola pasada la matriz global y una matriz por sesion.
+
+    args:
+        data (pd.DataFrame | ProfileStore): datos limpios.
+        columns (list): columnas a correlacionar; None para todas las de sensores.
+
+    returns:
+        tuple: (matriz global, dict de matrices por profile_id).
+    """
+    total, per_profile = accumulate_correlations(data, columns=columns, by_profile=True)
+    return total.correlation(), {pid: acc.correlation() for pid, acc in per_profile.items()}
@@ -1,22 +1,34 @@
 import pandas as pd 
 import numpy as np 
-
-def analyze_correlations(df: pd.DataFrame):
+from profile_store import as_dataframe
+from correlation_engine import compute_correlation_matrix
+from profile_summary import summarize_profiles
+from quantile_sketch import DEFAULT_K, accumulate_describe, rank_error_bound
+from instrumentation import instrumented
+
+@instrumented('correlacion')
+def analyze_correlations(df: pd.DataFrame, correlation_matrix: pd.DataFrame = None):
     """
     calcular y mostrar matriz de correlacion para variables numericas.
 
     args:
-        df (pd.DataFrame): dataframe limpio y con columna de tiempo.
+        df (pd.DataFrame | ProfileStore): dataframe limpio y con columna de tiempo.
+        correlation_matrix (pd.DataFrame): matriz ya calculada; None para calcularla.
+
+    returns:
+        pd.DataFrame: matriz de correlacion, para reutilizarla en el mapa de calor.
     """
     if df is None:
         print("no poder calcular correlaciones, el dataframe es nulo.")
         return
+    df = as_dataframe(df) # aceptar tambien un ProfileStore
 
     print("\n--- analisis de correlacion entre variables ---")
 
-    # calcular matriz de correlacion
+    # calcular matriz de correlacion en una pasada por lotes, sin copiar el dataset
     # excluir columnas de identificacion y tiempo
-    correlation_matrix = df.drop(columns=['profile_id', 'Tiempo_Segundos']).corr()
+    if correlation_matrix is None:
+        correlation_matrix = compute_correlation_matrix(df)
 
     print("\nmatriz de correlacion completa:")
     # usar to_string para mostrar matriz completa
@@ -42,50 +54,69 @@ def analyze_correlations(df: pd.DataFrame):
         print(f"     - {index}: {value:.4f}")
 
     print("\nesta seccion ayuda a identificar variables relacionadas con la temperatura del rotor.")
+    return correlation_matrix
 
 
-def analyze_descriptive_statistics(df: pd.DataFrame):
+@instrumented('estadisticas_descriptivas')
+def analyze_descriptive_statistics(df: pd.DataFrame, approximate: bool = False, k: int = DEFAULT_K):
     """
     calcular y mostrar estadisticas descriptivas para columnas numericas.
 
     args:
-        df (pd.DataFrame): dataframe limpio.
+        df (pd.DataFrame | ProfileStore): dataframe limpio.
+        approximate (bool): calcular percentiles con sketches por bloques en lugar de ordenar
+            cada columna completa (count, mean, std, min y max siguen siendo exactos).
+        k (int): precision de los sketches cuando approximate es True.
+
+    returns:
+        pd.DataFrame: tabla de estadisticas descriptivas (una fila por columna).
     """
     if df is None:
         print("no poder calcular estadisticas, el dataframe es nulo.")
         return
-
     print("\n--- estadisticas descriptivas del dataset ---")
-    # transponer tabla para mejor lectura
-    print(df.describe().T)
+    if approximate:
+        descriptive_stats = accumulate_describe(df, k=k)[0].describe() # misma tabla que describe().T
+        print(descriptive_stats)
+        print(f"percentiles aproximados: error de rango maximo ~{rank_error_bound(k):.2%}.")
+    else:
+        # transponer tabla para mejor lectura
+        descriptive_stats = as_dataframe(df).describe().T # aceptar tambien un ProfileStore
+        print(descriptive_stats)
     print("\nestas estadisticas resumen cada variable: promedio, desviacion, valores minimos y maximos, y distribucion.")
+    return descriptive_stats
 
-def analyze_profile_ids(df: pd.DataFrame):
+@instrumented('analisis_sesiones')
+def analyze_profile_ids(df: pd.DataFrame, summary: pd.DataFrame = None):
     """
     analizar cantidad y duracion de sesiones de prueba (profile_id).
 
     args:
-        df (pd.DataFrame): dataframe limpio.
+        df (pd.DataFrame | ProfileStore): dataframe limpio.
+        summary (pd.DataFrame): resumen de sesiones de summarize_profiles; None para calcularlo.
+
+    returns:
+        pd.DataFrame: resumen de todas las sesiones.
     """
     if df is None:
         print("no poder analizar los id de perfil, el dataframe es nulo.")
         return
+    if summary is None:
+        summary = summarize_profiles(df) # resumir todas las sesiones en una pasada
 
     print("\n--- analisis de sesiones de prueba (profile_id) ---")
 
     # contar numero de sesiones unicas
-    num_profiles = df['profile_id'].nunique()
+    num_profiles = len(summary)
     print(f"numero total de sesiones de prueba unicas: {num_profiles}")
 
     # obtener id de las sesiones
-    profile_ids = df['profile_id'].unique()
+    profile_ids = summary.index.to_numpy()
     print(f"los id de las sesiones son: {np.sort(profile_ids)}") # ordenar para mejor legibilidad
 
-    # calcular duracion de cada sesion
-    # agrupar por profile_id y obtener tiempo maximo
-    # considerar tiempo_segundos como duracion
-    profile_duration = df.groupby('profile_id')['Tiempo_Segundos'].max().reset_index()
-    profile_duration.columns = ['profile_id', 'duracion_segundos']
+    # obtener duracion de cada sesion del resumen
+    # considerar tiempo_segundos maximo como duracion
+    profile_duration = summary['duracion_segundos'].sort_index().reset_index()
 
     print("\nduracion de cada sesion de prueba (en segundos):")
     print(profile_duration)
@@ -96,4 +127,5 @@ def analyze_profile_ids(df: pd.DataFrame):
     max_duration = profile_duration['duracion_segundos'].max() # calcular duracion maxima
     print(f"\nduracion promedio de las sesiones: {avg_duration:.2f} segundos")
     print(f"duracion minima de una sesion: {min_duration:.2f} segundos")
-    print(f"duracion maxima de una sesion: {max_duration:.2f} segundos")
\ No newline at end of file
+    print(f"duracion maxima de una sesion: {max_duration:.2f} segundos")
+    return summary
\ No newline at end of file
@@ -0,0 +1,345 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+import numpy as np
+
+from data_loader import load_data_typed
+from data_cleaner import clean_and_prepare_data
+
+# --- configuracion de la cache ---
+DEFAULT_CACHE_DIR = '.motor_cache' # carpeta donde guardar los datasets limpios
+DEFAULT_MAX_CACHE_BYTES = 8 * 1024 ** 3 # tamaño maximo de la cache antes de expulsar entradas
+MANIFEST_NAME = 'manifest.json'
+INDEX_FILE = '_index.npy' # indice original del dataframe limpio
+FEATURE_CACHE_SUBDIR = 'caracteristicas' # subcarpeta de la cache con matrices de caracteristicas
+_HASH_BLOCK_BYTES = 8 * 1024 * 1024 # bloque de lectura para el hash del archivo
+_FINGERPRINTS = {} # (ruta, tamaño, mtime_ns) -> huella ya calculada en este proceso
+
+
+def source_fingerprint(file_path: str, cache_dir: str = None) -> dict:
+    """
+    calcular huella del archivo fuente: tamaño, fecha de modificacion y hash del contenido.
+
+    una huella ya calculada en este proceso, o la de una entrada de la cache del mismo archivo
+    con el mismo tamaño y fecha de modificacion, se reutiliza sin volver a leer el archivo; el
+    hash solo se recalcula cuando el archivo cambio.
+
+    args:
+        file_path (str): ruta del archivo csv.
+        cache_dir (str): carpeta raiz de la cache donde buscar una huella ya calculada.
+
+    returns:
+        dict: huella con la clave de cache derivada.
+    """
+    stat = os.stat(file_path)
+    source = os.path.abspath(file_path)
+    known = (source, stat.st_size, stat.st_mtime_ns)
+    if known in _FINGERPRINTS:
+        return dict(_FINGERPRINTS[known])
+    if cache_dir is not None:
+        for manifest in list_cache_entries(cache_dir):
+            if (manifest.get('source'), manifest.get('size'), manifest.get('mtime_ns')) == known:
+                return {field: manifest[field] for field in ('source', 'size', 'mtime_ns', 'sha256', 'key')}
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as handle: # leer por bloques para no cargar el archivo en memoria
+        for block in iter(lambda: handle.read(_HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    content_hash = digest.hexdigest()
+    key_material = f"{stat.st_size}:{stat.st_mtime_ns}:{content_hash}".encode()
+    fingerprint = {
+        'source': source,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': content_hash,
+        'key': hashlib.sha256(key_material).hexdigest()[:24],
+    }
+    _FINGERPRINTS[known] = fingerprint
+    return dict(fingerprint)
+
+
+def _read_manifest(entry_dir: str):
+    """
+    leer manifiesto de una entrada de cache, o None si no existe o esta corrupto.
+    """
+    try:
+        with open(os.path.join(entry_dir, MANIFEST_NAME), encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(entry_dir: str, manifest: dict):
+    """
+    escribir manifiesto de forma atomica.
+    """
+    tmp_path = os.path.join(entry_dir, MANIFEST_NAME + f'.tmp-{os.getpid()}') # un temporal por proceso
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2)
+    os.replace(tmp_path, os.path.join(entry_dir, MANIFEST_NAME))
+
+
+def _column_to_numpy(series: pd.Series) -> np.ndarray:
+    """
+    convertir columna a arreglo numpy compacto que se pueda mapear en memoria.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.to_numpy(dtype=series.cat.categories.dtype)
+    if hasattr(series.dtype, 'numpy_dtype'): # tipos enteros con nulos (Int16, etc.)
+        return series.to_numpy(dtype=series.dtype.numpy_dtype)
+    return series.to_numpy()
+
+
+def build_cache(df: pd.DataFrame, file_path: str, cache_dir: str = DEFAULT_CACHE_DIR,
+                max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES, fingerprint: dict = None) -> str:
+    """
+    guardar dataframe limpio como arreglos numpy particionados por profile_id.
+
+    cada columna se guarda en un .npy con las filas agrupadas por sesion (en orden de
+    primera aparicion) y el manifiesto registra el rango de filas de cada profile_id.
+
+    args:
+        df (pd.DataFrame): dataframe limpio con columna 'Tiempo_Segundos'.
+        file_path (str): archivo csv de origen.
+        cache_dir (str): carpeta raiz de la cache.
+        max_cache_bytes (int): tamaño maximo de la cache; None para no expulsar.
+        fingerprint (dict): huella ya calculada con source_fingerprint.
+
+    returns:
+        str: clave de la entrada creada.
+    """
+    fingerprint = fingerprint or source_fingerprint(file_path)
+    key = fingerprint['key']
+    entry_dir = os.path.join(cache_dir, key)
+    tmp_dir = entry_dir + f'.tmp-{os.getpid()}'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    # agrupar filas por sesion manteniendo el orden de aparicion de cada profile_id
+    codes, profile_ids = pd.factorize(df['profile_id'])
+    order = None if np.all(np.diff(codes) >= 0) else np.argsort(codes, kind='stable')
+    counts = np.bincount(codes, minlength=len(profile_ids))
+    stops = np.cumsum(counts)
+
+    index_values = df.index.to_numpy()
+    np.save(os.path.join(tmp_dir, INDEX_FILE), index_values if order is None else index_values[order])
+    for col in df.columns: # guardar cada columna como arreglo contiguo
+        values = _column_to_numpy(df[col])
+        np.save(os.path.join(tmp_dir, f'{col}.npy'), values if order is None else values[order])
+
+    manifest = dict(fingerprint)
+    manifest.update({
+        'columns': list(df.columns),
+        'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+        'rows': int(len(df)),
+        'profiles': [
+            {'profile_id': pid.item() if hasattr(pid, 'item') else pid, 'start': int(stop - count), 'stop': int(stop)}
+            for pid, count, stop in zip(profile_ids, counts, stops)
+        ],
+        'bytes': sum(os.path.getsize(os.path.join(tmp_dir, name)) for name in os.listdir(tmp_dir)),
+        'created': time.time(),
+        'last_access': time.time(),
+    })
+    _write_manifest(tmp_dir, manifest)
+
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir) # publicar la entrada completa de una vez
+
+    # invalidar entradas viejas del mismo archivo y respetar el limite de tamaño
+    invalidate_cache(file_path, cache_dir=cache_dir, keep_key=key)
+    if max_cache_bytes is not None:
+        evict_cache(cache_dir, max_cache_bytes, protect_key=key)
+
+    print(f"cache del dataset limpio guardar en '{entry_dir}' ({manifest['bytes'] / 1e6:.1f} mb).")
+    return key
+
+
+def load_cache(file_path: str, cache_dir: str = DEFAULT_CACHE_DIR, profile_ids: list = None,
+               columns: list = None, fingerprint: dict = None):
+    """
+    abrir dataset limpio desde la cache mapeando los arreglos en memoria.
+
+    con todas las sesiones los datos no se copian; con un subconjunto de profile_id solo
+    se copian las filas de esas sesiones. la lectura no escribe en la entrada: el ultimo uso
+    se registra en la fecha de modificacion de su carpeta, asi que varios procesos pueden
+    leer la misma entrada a la vez.
+
+    args:
+        file_path (str): archivo csv de origen.
+        cache_dir (str): carpeta raiz de la cache.
+        profile_ids (list): sesiones a leer; None para todas.
+        columns (list): columnas a leer; None para todas.
+        fingerprint (dict): huella ya calculada con source_fingerprint.
+
+    returns:
+        pd.DataFrame: dataframe limpio, o None si no hay entrada valida.
+    """
+    fingerprint = fingerprint or source_fingerprint(file_path, cache_dir)
+    entry_dir = os.path.join(cache_dir, fingerprint['key'])
+    manifest = _read_manifest(entry_dir)
+    if manifest is None or manifest.get('sha256') != fingerprint['sha256']:
+        return None
+
+    columns = manifest['columns'] if columns is None else [col for col in manifest['columns'] if col in columns]
+    ranges = [(p['start'], p['stop']) for p in manifest['profiles']]
+    if profile_ids is not None:
+        wanted = set(profile_ids)
+        ranges = [(p['start'], p['stop']) for p in manifest['profiles'] if p['profile_id'] in wanted]
+
+    def read(name):
+        array = np.load(os.path.join(entry_dir, name), mmap_mode='r') # mapear sin leer todo el archivo
+        if profile_ids is None:
+            return array
+        return np.concatenate([array[start:stop] for start, stop in ranges]) if ranges else array[:0]
+
+    data = {}
+    for col in columns:
+        values = read(f'{col}.npy')
+        dtype = manifest['dtypes'][col]
+        data[col] = values if dtype == str(values.dtype) else pd.array(values, dtype=dtype)
+    df = pd.DataFrame(data, index=pd.Index(read(INDEX_FILE)), copy=False)
+
+    try:
+        os.utime(entry_dir) # registrar uso para la politica de expulsion
+    except OSError: # otro proceso expulso la entrada; los arreglos ya abiertos siguen validos
+        pass
+    return df
+
+
+def _last_access(entry_dir: str, manifest: dict) -> float:
+    """
+    ultimo uso de una entrada: el mas reciente entre el manifiesto y la carpeta.
+    """
+    try:
+        touched = os.path.getmtime(entry_dir)
+    except OSError:
+        touched = 0
+    return max(manifest.get('last_access', 0), touched)
+
+
+def _entry_dirs(root: str) -> list:
+    """
+    carpetas con manifiesto valido dentro de root, como (carpeta, manifiesto).
+    """
+    if not os.path.isdir(root):
+        return []
+    entries = []
+    for name in os.listdir(root):
+        entry_dir = os.path.join(root, name)
+        manifest = _read_manifest(entry_dir) if os.path.isdir(entry_dir) else None
+        if manifest is not None:
+            entries.append((entry_dir, manifest))
+    return entries
+
+
+def _all_entry_dirs(cache_dir: str) -> list:
+    """
+    entradas de datasets limpios y de matrices de caracteristicas, como (carpeta, manifiesto).
+    """
+    return _entry_dirs(cache_dir) + _entry_dirs(os.path.join(cache_dir, FEATURE_CACHE_SUBDIR))
+
+
+def list_cache_entries(cache_dir: str = DEFAULT_CACHE_DIR) -> list:
+    """
+    listar entradas de datasets limpios de la cache con su manifiesto.
+
+    returns:
+        list: manifiestos de las entradas validas.
+    """
+    return [manifest for _, manifest in _entry_dirs(cache_dir)]
+
+
+def invalidate_cache(file_path: str = None, cache_dir: str = DEFAULT_CACHE_DIR, keep_key: str = None) -> int:
+    """
+    eliminar entradas de la cache de un archivo fuente, o todas si no se indica archivo.
+
+    incluye las matrices de caracteristicas: las calculadas desde la version keep_key del
+    archivo se conservan y las de otras versiones se eliminan.
+
+    args:
+        file_path (str): archivo csv de origen; None para vaciar la cache.
+        cache_dir (str): carpeta raiz de la cache.
+        keep_key (str): clave del dataset que no se debe eliminar.
+
+    returns:
+        int: numero de entradas eliminadas.
+    """
+    source = os.path.abspath(file_path) if file_path is not None else None
+    removed = 0
+    for entry_dir, manifest in _all_entry_dirs(cache_dir):
+        # las matrices de caracteristicas guardan en 'source_key' la clave del dataset de origen
+        if manifest.get('source_key', manifest['key']) == keep_key:
+            continue
+        if source is not None and manifest['source'] != source:
+            continue
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        removed += 1
+    return removed
+
+
+def evict_cache(cache_dir: str = DEFAULT_CACHE_DIR, max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+                protect_key: str = None) -> int:
+    """
+    expulsar entradas usadas hace mas tiempo hasta que la cache quepa en el limite.
+
+    el tamaño y el orden de uso cuentan juntas las entradas de datasets limpios y las de
+    matrices de caracteristicas.
+
+    args:
+        cache_dir (str): carpeta raiz de la cache.
+        max_cache_bytes (int): tamaño maximo permitido.
+        protect_key (str): clave que no se debe expulsar (por ejemplo, la recien creada).
+
+    returns:
+        int: numero de entradas expulsadas.
+    """
+    entries = sorted(_all_entry_dirs(cache_dir), key=lambda entry: _last_access(*entry)) # menos reciente primero
+    total = sum(manifest['bytes'] for _, manifest in entries)
+    evicted = 0
+    for entry_dir, manifest in entries:
+        if total <= max_cache_bytes:
+            break
+        if manifest['key'] == protect_key:
+            continue
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total -= manifest['bytes']
+        evicted += 1
+    return evicted
+
+
+def load_clean_data_cached(file_path: str, cache_dir: str = DEFAULT_CACHE_DIR, profile_ids: list = None,
+                           columns: list = None, max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+                           fingerprint: dict = None) -> pd.DataFrame:
+    """
+    devolver dataset limpio desde la cache, o cargar, limpiar y guardar si no existe.
+
+    args:
+        file_path (str): archivo csv de origen.
+        cache_dir (str): carpeta raiz de la cache.
+        profile_ids (list): sesiones a devolver; None para todas.
+        columns (list): columnas a devolver; None para todas.
+        max_cache_bytes (int): tamaño maximo de la cache.
+        fingerprint (dict): huella ya calculada con source_fingerprint.
+
+    returns:
+        pd.DataFrame: dataframe limpio con columna 'Tiempo_Segundos', o None si falla la carga.
+    """
+    fingerprint = fingerprint or source_fingerprint(file_path, cache_dir)
+    df = load_cache(file_path, cache_dir, profile_ids=profile_ids, columns=columns, fingerprint=fingerprint)
+    if df is not None:
+        print(f"dataset limpio cargar desde la cache ({len(df)} filas).")
+        return df
+
+    print("cache no disponible, cargar y limpiar el dataset.")
+    df_cleaned = clean_and_prepare_data(load_data_typed(file_path)) # pasar por el pipeline completo
+    if df_cleaned is None:
+        return None
+    build_cache(df_cleaned, file_path, cache_dir=cache_dir, max_cache_bytes=max_cache_bytes, fingerprint=fingerprint)
+    if profile_ids is not None:
+        df_cleaned = df_cleaned[df_cleaned['profile_id'].isin(profile_ids)]
+    if columns is not None:
+        df_cleaned = df_cleaned[[col for col in df_cleaned.columns if col in columns]]
+    return df_cleaned
@@ -1,6 +1,8 @@
 import pandas as pd 
 import numpy as np 
+from instrumentation import instrumented
 
+@instrumented('limpiar')
 def clean_and_prepare_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     realizar limpieza de valores nulos y generar columna de tiempo.
@@ -19,28 +21,76 @@ def clean_and_prepare_data(df: pd.DataFrame) -> pd.DataFrame:
 
     #manejar valores nulos
     initial_rows = df.shape[0] # obtener numero inicial de filas
-    df_cleaned = df.dropna().copy() # eliminar filas con nulos y crear copia
+    valid_rows = df.notna().all(axis=1).to_numpy() # marcar filas completas
+    if valid_rows.all():
+        df_cleaned = df.copy(deep=False) # sin nulos: copia superficial, la nueva columna no toca el original
+    else:
+        df_cleaned = df.take(np.flatnonzero(valid_rows)) # una sola copia con las filas validas
     rows_after_dropna = df_cleaned.shape[0] # obtener numero de filas despues de eliminar nulos
 
     if initial_rows > rows_after_dropna:
         print(f"eliminar {initial_rows - rows_after_dropna} fila(s) con valores nulos.") # mostrar filas eliminadas
     else:
         print("no encontrar filas con valores nulos para eliminar.") # mostrar mensaje si no hay nulos
-
-    # verificar nulos restantes
-    null_after_drop = df_cleaned.isnull().sum().sum() # contar nulos totales
-    if null_after_drop == 0:
-        print("el dataframe ahora estar libre de valores nulos!") # confirmar ausencia de nulos
-    else:
-        print(f"advertencia: aun quedar {null_after_drop} valores nulos despues de la limpieza basica.") # advertir sobre nulos restantes
+    # el filtro por filas completas garantiza que no quedan nulos, evitar una segunda pasada con isnull()
+    print("el dataframe ahora estar libre de valores nulos!") # confirmar ausencia de nulos
 
     #generar columna de tiempo
-    # agrupar por 'profile_id' y generar contador para cada elemento
-    df_cleaned['Tiempo_Segundos'] = df_cleaned.groupby('profile_id').cumcount() / 2
+    # contar filas por 'profile_id' con el mismo contador que usa la version por bloques
+    assign_session_time(df_cleaned, {})
     print("columna 'tiempo_segundos' generar para cada sesion de prueba.") # mostrar confirmacion de columna generada
     print(f"primeros 5 valores de 'tiempo_segundos':\n{df_cleaned['Tiempo_Segundos'].head()}") # mostrar primeros valores
     print(f"ultimos 5 valores de 'tiempo_segundos':\n{df_cleaned['Tiempo_Segundos'].tail()}") # mostrar ultimos valores
 
     print("\n--- limpieza y preparacion completadas ---") # mostrar finalizacion de proceso
 
-    return df_cleaned # devolver dataframe limpio
\ No newline at end of file
+    return df_cleaned # devolver dataframe limpio
+
+
+@instrumented('tiempo_sesion')
+def assign_session_time(df: pd.DataFrame, counters: dict) -> pd.DataFrame:
+    """
+    generar columna 'Tiempo_Segundos' continuando los contadores de cada sesion.
+
+    args:
+        df (pd.DataFrame): bloque limpio; se modifica en el lugar.
+        counters (dict): filas ya vistas por profile_id; se actualiza en el lugar.
+
+    returns:
+        pd.DataFrame: el mismo bloque con la columna de tiempo.
+    """
+    position = df.groupby('profile_id', sort=False).cumcount().to_numpy() # posicion dentro del bloque
+    if counters:
+        # sumar filas vistas en bloques anteriores para sesiones que cruzan bloques
+        position = position + df['profile_id'].map(counters).fillna(0).to_numpy(dtype='int64')
+    df['Tiempo_Segundos'] = position / 2 # muestreo a 2 hz: cada fila son 0.5 segundos
+
+    for profile_id, size in df['profile_id'].value_counts(sort=False).items(): # actualizar contadores
+        counters[profile_id] = counters.get(profile_id, 0) + int(size)
+    return df
+
+
+def clean_and_prepare_chunks(chunks, counters: dict = None):
+    """
+    limpiar bloques de datos en streaming manteniendo el tiempo de cada sesion.
+
+    args:
+        chunks (iterable): iterador de dataframes, por ejemplo de load_data_chunks.
+        counters (dict): contadores por profile_id para reanudar un streaming previo.
+
+    yields:
+        pd.DataFrame: bloques limpios con columna 'Tiempo_Segundos'.
+    """
+    counters = {} if counters is None else counters
+    rows_in = rows_out = 0
+
+    for chunk in chunks: # procesar cada bloque sin acumular el dataset
+        rows_in += len(chunk)
+        chunk.dropna(inplace=True) # eliminar nulos en el lugar, sin copia adicional
+        rows_out += len(chunk)
+        if chunk.empty:
+            continue
+        yield assign_session_time(chunk, counters)
+
+    print(f"\nlimpieza por bloques: {rows_in} filas leidas, {rows_in - rows_out} fila(s) con nulos eliminadas, "
+          f"{len(counters)} sesiones.") # mostrar resumen de limpieza
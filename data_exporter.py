@@ -1,48 +1,295 @@
+import gzip
+import os
+import time
+
 import pandas as pd 
+from profile_store import ProfileStore, as_dataframe
+from instrumentation import instrumented
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional, solo se necesita para parquet
+    pa = None
+    pq = None
+
+# --- nombres de columnas amigables para power bi ---
+POWERBI_COLUMN_NAMES = {
+    'u_q': 'voltaje_q_v', # renombrar columna de voltaje q
+    'coolant': 'temperatura_refrigerante_c', # renombrar columna de temperatura refrigerante
+    'stator_winding': 'temperatura_devanado_estator_c', # renombrar columna de temperatura devanado estator
+    'u_d': 'voltaje_d_v', # renombrar columna de voltaje d
+    'stator_tooth': 'temperatura_diente_estator_c', # renombrar columna de temperatura diente estator
+    'motor_speed': 'velocidad_motor_rpm', # renombrar columna de velocidad motor
+    'i_d': 'corriente_d_a', # renombrar columna de corriente d
+    'i_q': 'corriente_q_a', # renombrar columna de corriente q
+    'pm': 'temperatura_rotor_c', # renombrar columna de temperatura rotor
+    'stator_yoke': 'temperatura_yugo_estator_c', # renombrar columna de temperatura yugo estator
+    'ambient': 'temperatura_ambiente_c', # renombrar columna de temperatura ambiente
+    'torque': 'torque_nm', # renombrar columna de torque
+    'profile_id': 'id_sesion_prueba', # renombrar columna de id de sesion de prueba
+    'Tiempo_Segundos': 'tiempo_sesion_segundos' # renombrar columna de tiempo de sesion
+}
+
 
+PARTITION_COLUMN = 'profile_id' # columna que define las particiones del parquet
+DEFAULT_ROW_GROUP_SIZE = 128_000 # filas por grupo de filas en parquet
+DEFAULT_COMPRESSION = 'zstd'
+DEFAULT_EXPORT_CHUNK_ROWS = 250_000 # filas por bloque al exportar un dataframe en memoria
+
+
+@instrumented('exportar_powerbi')
 def export_powerbi_ready_data(df: pd.DataFrame, file_path: str = 'motor_data_powerbi_ready.csv'):
     """
     renombrar columnas de dataframe y exportar a archivo csv o parquet.
 
     args:
-        df (pd.DataFrame): dataframe limpio con columna de tiempo.
+        df (pd.DataFrame | ProfileStore): dataframe limpio con columna de tiempo.
         file_path (str): ruta y nombre de archivo de salida.
     """
     if df is None:
         print("error: el dataframe proporcionado es nulo. no poder exportar.") # mostrar error si dataframe es nulo
         return
+    df = as_dataframe(df) # aceptar tambien un ProfileStore
 
     print(f"\n--- preparar y exportar datos para power bi ---") # mostrar mensaje de preparacion
 
 
 
     # --- renombrar columnas para claridad en power bi ---
-    df_powerbi_ready = df.rename(columns={
-        'u_q': 'voltaje_q_v', # renombrar columna de voltaje q
-        'coolant': 'temperatura_refrigerante_c', # renombrar columna de temperatura refrigerante
-        'stator_winding': 'temperatura_devanado_estator_c', # renombrar columna de temperatura devanado estator
-        'u_d': 'voltaje_d_v', # renombrar columna de voltaje d
-        'stator_tooth': 'temperatura_diente_estator_c', # renombrar columna de temperatura diente estator
-        'motor_speed': 'velocidad_motor_rpm', # renombrar columna de velocidad motor
-        'i_d': 'corriente_d_a', # renombrar columna de corriente d
-        'i_q': 'corriente_q_a', # renombrar columna de corriente q
-        'pm': 'temperatura_rotor_c', # renombrar columna de temperatura rotor
-        'stator_yoke': 'temperatura_yugo_estator_c', # renombrar columna de temperatura yugo estator
-        'ambient': 'temperatura_ambiente_c', # renombrar columna de temperatura ambiente
-        'torque': 'torque_nm', # renombrar columna de torque
-        'profile_id': 'id_sesion_prueba', # renombrar columna de id de sesion de prueba
-        'Tiempo_Segundos': 'tiempo_sesion_segundos' # renombrar columna de tiempo de sesion
-    })
+    # los nombres se aplican al escribir, sin crear una copia renombrada del dataframe
+    names = {col: POWERBI_COLUMN_NAMES.get(col, col) for col in df.columns}
 
     # --- exportar dataframe con nombres amigables ---
+    _write_powerbi_file(df, file_path, names)
+
+
+def powerbi_column_name(column: str) -> str:
+    """
+    traducir nombre de columna, incluidas las de agregados como 'pm_promedio'.
+
+    args:
+        column (str): nombre original de la columna.
+
+    returns:
+        str: nombre amigable para power bi.
+    """
+    if column in POWERBI_COLUMN_NAMES:
+        return POWERBI_COLUMN_NAMES[column]
+    base, _, stat = column.rpartition('_') # separar sufijo de estadistica
+    if base in POWERBI_COLUMN_NAMES:
+        return f"{POWERBI_COLUMN_NAMES[base]}_{stat}"
+    return column
+
+
+@instrumented('exportar_agregados')
+def export_powerbi_rollup(pyramid: dict, resolution: float, file_path: str = 'motor_data_powerbi_rollup.csv'):
+    """
+    exportar un nivel de agregados con los nombres amigables de power bi.
+
+    args:
+        pyramid (dict): niveles de build_rollup_pyramid (o un dataframe de un nivel).
+        resolution (float): segundos por cubeta del nivel a exportar.
+        file_path (str): ruta y nombre de archivo de salida.
+    """
+    rollup = pyramid.get(resolution) if isinstance(pyramid, dict) else pyramid
+    if rollup is None:
+        print(f"error: no existir nivel de agregados de {resolution} s. no poder exportar.") # mostrar error si falta nivel
+        return
+
+    print(f"\n--- exportar agregados de {resolution} s para power bi ---") # mostrar mensaje de preparacion
+    names = {col: powerbi_column_name(col) for col in rollup.columns} # renombrar columnas con sufijo de estadistica
+    names['Tiempo_Segundos'] = 'tiempo_sesion_segundos_inicio' # el tiempo marca el inicio de la cubeta
+    _write_powerbi_file(rollup, file_path, names)
+
+
+def _write_powerbi_file(df: pd.DataFrame, file_path: str, names: dict):
+    """
+    escribir dataframe como csv o parquet segun la extension, aplicando los nombres al escribir.
+    """
     if file_path.endswith('.csv'):
-        # exportar a csv, sin indice y con punto decimal
-        df_powerbi_ready.to_csv(file_path, index=False, decimal='.')
+        # exportar a csv, sin indice y con punto decimal; header reemplaza los nombres sin copiar datos
+        df.to_csv(file_path, index=False, decimal='.', header=[names[col] for col in df.columns])
         print(f"dataset preparado para power bi exportar como '{file_path}' (csv).") # mostrar mensaje de exportacion csv
     elif file_path.endswith('.parquet'):
         # exportar a parquet, sin indice
-        df_powerbi_ready.to_parquet(file_path, index=False)
+        if pq is not None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            pq.write_table(table.rename_columns([names[col] for col in df.columns]), file_path)
+        else:
+            df.rename(columns=names).to_parquet(file_path, index=False)
         print(f"dataset preparado para power bi exportar como '{file_path}' (parquet).") # mostrar mensaje de exportacion parquet
     else:
         # mostrar advertencia por formato de archivo no soportado
-        print("advertencia: formato de archivo no soportado. usar '.csv' o '.parquet'.")
\ No newline at end of file
+        print("advertencia: formato de archivo no soportado. usar '.csv' o '.parquet'.")
+
+
+def _iter_export_chunks(data, chunk_rows: int):
+    """
+    normalizar la entrada del exportador a un iterador de bloques.
+    """
+    if isinstance(data, (pd.DataFrame, ProfileStore)):
+        df = as_dataframe(data)
+        for start in range(0, len(df), chunk_rows): # cortes por posicion, sin copia
+            yield df.iloc[start:start + chunk_rows]
+    else:
+        yield from data
+
+
+def _arrow_schema(chunk: pd.DataFrame, downcast_float32: bool):
+    """
+    esquema arrow del bloque con nombres de power bi y flotantes opcionalmente en float32.
+    """
+    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+    fields = []
+    for field in schema:
+        field_type = pa.float32() if downcast_float32 and pa.types.is_floating(field.type) else field.type
+        fields.append(pa.field(POWERBI_COLUMN_NAMES.get(field.name, field.name), field_type))
+    return pa.schema(fields)
+
+
+class _PartitionedParquetWriter:
+    """
+    escritor de parquet con un archivo por sesion y grupos de filas de tamaño fijo.
+
+    el id de sesion solo va en el nombre de la carpeta ('id_sesion_prueba=<id>'), no dentro
+    del archivo, para que los lectores de datasets particionados no encuentren dos tipos para
+    la misma columna. las filas de cada sesion se acumulan hasta completar un grupo de filas;
+    una sesion que no aparece en el bloque actual se vacia a disco y se cierra su archivo, asi
+    la memoria y los archivos abiertos quedan acotados cuando las sesiones llegan contiguas,
+    como en el csv original.
+    """
+
+    def __init__(self, output_dir: str, row_group_size: int, compression: str, downcast_float32: bool):
+        self.output_dir = output_dir
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.downcast_float32 = downcast_float32
+        self.columns = None # columnas escritas dentro de cada archivo
+        self.schema = None
+        self.writers = {} # profile_id -> ParquetWriter abierto
+        self.parts = {} # profile_id -> archivos ya escritos de la sesion
+        self.buffers = {} # profile_id -> lista de tablas pendientes
+        self.buffered_rows = {}
+        self.paths = []
+
+    def write(self, chunk: pd.DataFrame):
+        if self.schema is None:
+            self.columns = [col for col in chunk.columns if col != PARTITION_COLUMN]
+            self.schema = _arrow_schema(chunk[self.columns], self.downcast_float32)
+        store = ProfileStore.from_dataframe(chunk, sort=False) # sesiones contiguas dentro del bloque
+        for profile_id, df_profile in store:
+            table = pa.Table.from_pandas(df_profile, columns=self.columns, preserve_index=False)
+            table = table.rename_columns(self.schema.names).cast(self.schema) # renombrar y reducir tipos en arrow
+            self.buffers.setdefault(profile_id, []).append(table)
+            self.buffered_rows[profile_id] = self.buffered_rows.get(profile_id, 0) + table.num_rows
+            if self.buffered_rows[profile_id] >= self.row_group_size:
+                self._flush(profile_id, final=False)
+        for profile_id in [pid for pid in self.buffers if pid not in store]:
+            self._flush(profile_id, final=True) # sesion terminada: escribir resto y cerrar
+
+    def _flush(self, profile_id, final: bool):
+        tables = self.buffers.pop(profile_id, [])
+        self.buffered_rows.pop(profile_id, None)
+        table = pa.concat_tables(tables) if tables else None
+        if table is not None:
+            full_rows = table.num_rows if final else table.num_rows - table.num_rows % self.row_group_size
+            if full_rows:
+                self._writer(profile_id).write_table(table.slice(0, full_rows), row_group_size=self.row_group_size)
+            if full_rows < table.num_rows: # guardar filas que no completan un grupo
+                self.buffers[profile_id] = [table.slice(full_rows)]
+                self.buffered_rows[profile_id] = table.num_rows - full_rows
+        if final and profile_id in self.writers:
+            self.writers.pop(profile_id).close()
+
+    def _writer(self, profile_id):
+        """
+        archivo abierto de la sesion; si la sesion reaparece despues de cerrarse se abre otra parte.
+        """
+        writer = self.writers.get(profile_id)
+        if writer is None:
+            partition_dir = os.path.join(self.output_dir, f"{POWERBI_COLUMN_NAMES[PARTITION_COLUMN]}={profile_id}")
+            os.makedirs(partition_dir, exist_ok=True)
+            part = self.parts.get(profile_id, 0)
+            path = os.path.join(partition_dir, f'part-{part}.parquet')
+            writer = pq.ParquetWriter(path, self.schema, compression=self.compression)
+            self.writers[profile_id] = writer
+            self.parts[profile_id] = part + 1
+            self.paths.append(path)
+        return writer
+
+    def close(self) -> list:
+        for profile_id in list(self.buffers):
+            self._flush(profile_id, final=True)
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+        return self.paths
+
+
+@instrumented('exportar_bloques')
+def export_powerbi_stream(data, output_path: str, row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                          compression: str = DEFAULT_COMPRESSION, downcast_float32: bool = True,
+                          chunk_rows: int = DEFAULT_EXPORT_CHUNK_ROWS) -> dict:
+    """
+    exportar datos limpios por bloques, sin copia renombrada y con reporte de rendimiento.
+
+    con una ruta terminada en '.csv' (o '.csv.gz') escribe un solo csv bloque a bloque; con
+    cualquier otra ruta crea una carpeta parquet con una particion por 'id_sesion_prueba'
+    (el id se lee del nombre de la carpeta, por ejemplo con pd.read_parquet(output_path)).
+
+    args:
+        data: iterador de bloques limpios (por ejemplo de clean_and_prepare_chunks),
+            un dataframe o un ProfileStore.
+        output_path (str): archivo csv o carpeta de salida para parquet.
+        row_group_size (int): filas por grupo de filas en parquet.
+        compression (str): codec de parquet ('zstd', 'snappy', 'gzip', None...).
+        downcast_float32 (bool): escribir columnas flotantes como float32 en parquet.
+        chunk_rows (int): filas por bloque si se recibe un dataframe en memoria.
+
+    returns:
+        dict: filas, bytes escritos, segundos y rendimiento.
+    """
+    if data is None:
+        print("error: el dataframe proporcionado es nulo. no poder exportar.") # mostrar error si dataframe es nulo
+        return None
+
+    print(f"\n--- exportar datos para power bi por bloques a '{output_path}' ---") # mostrar mensaje de preparacion
+    start = time.perf_counter()
+    rows = 0
+    is_csv = output_path.endswith('.csv') or output_path.endswith('.csv.gz')
+
+    if is_csv:
+        opener = gzip.open if output_path.endswith('.gz') else open
+        with opener(output_path, 'wt', newline='', encoding='utf-8') as handle:
+            header_written = False # un bloque vacio no cuenta filas, asi que no sirve rows == 0
+            for chunk in _iter_export_chunks(data, chunk_rows):
+                # escribir encabezado solo con el primer bloque, nombres aplicados sin copia
+                header = False if header_written else [POWERBI_COLUMN_NAMES.get(col, col) for col in chunk.columns]
+                chunk.to_csv(handle, index=False, decimal='.', header=header)
+                header_written = True
+                rows += len(chunk)
+        paths = [output_path]
+    else:
+        if pq is None:
+            raise ImportError("exportar parquet por particiones requiere pyarrow.")
+        writer = _PartitionedParquetWriter(output_path, row_group_size, compression, downcast_float32)
+        for chunk in _iter_export_chunks(data, chunk_rows):
+            writer.write(chunk)
+            rows += len(chunk)
+        paths = writer.close()
+
+    elapsed = time.perf_counter() - start
+    bytes_written = sum(os.path.getsize(path) for path in paths)
+    report = {
+        'output_path': output_path,
+        'files': len(paths),
+        'rows': rows,
+        'bytes_written': bytes_written,
+        'seconds': elapsed,
+        'rows_per_second': rows / elapsed if elapsed > 0 else float('inf'),
+        'megabytes_per_second': bytes_written / 1e6 / elapsed if elapsed > 0 else float('inf'),
+    }
+    print(f"exportar {rows} filas en {len(paths)} archivo(s): {bytes_written / 1e6:.1f} mb en {elapsed:.2f} s "
+          f"({report['rows_per_second']:,.0f} filas/s, {report['megabytes_per_second']:.1f} mb/s).")
+    return report
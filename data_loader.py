@@ -0,0 +1,212 @@
+import time
+import tracemalloc
+
+import pandas as pd
+import numpy as np
+
+from instrumentation import instrumented
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow es opcional, usar parser de pandas si no esta instalado
+    pa = None
+    pa_csv = None
+
+# --- esquema declarado de las 13 columnas del dataset ---
+# los sensores se leen como float32 (la mitad de memoria que float64)
+SENSOR_COLUMNS = [
+    'u_q', 'coolant', 'stator_winding', 'u_d', 'stator_tooth', 'motor_speed',
+    'i_d', 'i_q', 'pm', 'stator_yoke', 'ambient', 'torque',
+]
+MOTOR_SCHEMA = {col: 'float32' for col in SENSOR_COLUMNS}
+MOTOR_SCHEMA['profile_id'] = 'Int16' # entero compacto con soporte de nulos
+MOTOR_COLUMNS = list(MOTOR_SCHEMA)
+
+DEFAULT_CHUNKSIZE = 250_000 # filas por bloque al leer en modo streaming
+_APPROX_BYTES_PER_ROW = 200 # tamaño aproximado de una fila del csv en texto
+
+
+def _resolve_columns(columns):
+    """
+    validar columnas solicitadas y devolverlas en el orden del esquema.
+    """
+    if columns is None:
+        return MOTOR_COLUMNS
+    unknown = [col for col in columns if col not in MOTOR_SCHEMA]
+    if unknown:
+        raise ValueError(f"columnas desconocidas en el esquema del motor: {unknown}")
+    return [col for col in MOTOR_COLUMNS if col in columns]
+
+
+def _resolve_engine(engine):
+    """
+    elegir backend de parseo: 'pyarrow' si esta instalado, si no 'c' de pandas.
+    """
+    if engine is None:
+        return 'pyarrow' if pa_csv is not None else 'c'
+    if engine == 'pyarrow' and pa_csv is None:
+        raise ImportError("el backend 'pyarrow' no esta instalado.")
+    return engine
+
+
+def _apply_schema(chunk: pd.DataFrame, profile_id_dtype: str) -> pd.DataFrame:
+    """
+    convertir profile_id (leido como float) al tipo compacto declarado.
+    """
+    if 'profile_id' in chunk.columns:
+        chunk['profile_id'] = chunk['profile_id'].astype(profile_id_dtype)
+    return chunk
+
+
+def _iter_pandas_chunks(file_path, columns, chunksize):
+    """
+    leer bloques con el parser de pandas usando el esquema declarado.
+    """
+    # profile_id se lee como float32 porque el csv puede escribirlo como '11.0'
+    dtypes = {col: 'float32' for col in columns}
+    reader = pd.read_csv(file_path, usecols=columns, dtype=dtypes, chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            yield chunk[columns] # mantener orden del esquema
+
+
+def _iter_pyarrow_chunks(file_path, columns, chunksize):
+    """
+    leer bloques con el lector streaming de pyarrow (multihilo).
+    """
+    read_options = pa_csv.ReadOptions(block_size=max(chunksize * _APPROX_BYTES_PER_ROW, 1 << 20))
+    convert_options = pa_csv.ConvertOptions(
+        column_types={col: pa.float32() for col in columns},
+        include_columns=columns,
+    )
+    reader = pa_csv.open_csv(file_path, read_options=read_options, convert_options=convert_options)
+    start = 0
+    for batch in reader:
+        chunk = batch.to_pandas()
+        chunk.index = pd.RangeIndex(start, start + len(chunk)) # indice global continuo como en pandas
+        start += len(chunk)
+        yield chunk
+
+
+def load_data_chunks(file_path: str, columns: list = None, chunksize: int = DEFAULT_CHUNKSIZE,
+                     engine: str = None, profile_id_dtype: str = 'Int16', stats: dict = None,
+                     track_memory: bool = False):
+    """
+    leer csv del motor por bloques con el esquema declarado y memoria acotada.
+
+    el tiempo y la memoria del reporte son solo los de leer cada bloque: tracemalloc se activa
+    mientras se parsea un bloque y se detiene antes de entregarlo, asi que el codigo que
+    consume los bloques nunca corre trazado ni se cuenta en el pico. la memoria de arrow se
+    reporta como el aumento del pico del pool de arrow ('arrow_peak_growth_bytes'): en un
+    proceso nuevo es el pico de la lectura; si otra lectura ya llevo el pico mas alto es menor.
+
+    args:
+        file_path (str): ruta del archivo csv.
+        columns (list): columnas a leer; None para leer las 13 columnas.
+        chunksize (int): filas por bloque (aproximado con el backend pyarrow).
+        engine (str): 'pyarrow', 'c' o None para elegir el mas rapido instalado.
+        profile_id_dtype (str): tipo de profile_id, por ejemplo 'Int16' o 'category'.
+        stats (dict): diccionario opcional donde guardar el reporte al terminar.
+        track_memory (bool): medir el pico de memoria por bloque con tracemalloc (frena el
+            parseo); si otro codigo ya tiene tracemalloc activo no se mide.
+
+    yields:
+        pd.DataFrame: bloques con indice global continuo.
+    """
+    columns = _resolve_columns(columns)
+    engine = _resolve_engine(engine)
+    iterator = _iter_pyarrow_chunks if engine == 'pyarrow' else _iter_pandas_chunks
+    chunks = iterator(file_path, columns, chunksize)
+
+    tracing = track_memory and not tracemalloc.is_tracing() # no interferir con un tracemalloc ya activo
+    arrow_pool = pa.default_memory_pool() if pa is not None and engine == 'pyarrow' else None
+    arrow_start = (arrow_pool.max_memory() or 0) if arrow_pool is not None else 0
+    elapsed = 0.0
+    peak_bytes = 0
+    rows = 0
+    try:
+        while True:
+            start = time.perf_counter()
+            if tracing:
+                tracemalloc.start()
+            try:
+                chunk = next(chunks, None)
+            finally:
+                if tracing: # apagar antes de entregar el bloque
+                    peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
+                elapsed += time.perf_counter() - start
+            if chunk is None:
+                break
+            rows += len(chunk)
+            yield _apply_schema(chunk, profile_id_dtype)
+    finally:
+        chunks.close()
+        report = {
+            'file_path': file_path,
+            'engine': engine,
+            'rows': rows,
+            'seconds': elapsed,
+            'rows_per_second': rows / elapsed if elapsed > 0 else float('inf'),
+            'peak_memory_bytes': peak_bytes if tracing else None,
+        }
+        if arrow_pool is not None: # memoria de arrow, fuera de tracemalloc
+            # el pico del pool es de todo el proceso y no se puede reiniciar: se reporta cuanto subio
+            report['arrow_peak_growth_bytes'] = max((arrow_pool.max_memory() or 0) - arrow_start, 0)
+        if stats is not None:
+            stats.update(report)
+
+
+@instrumented('cargar')
+def load_data_typed(file_path: str, columns: list = None, engine: str = None,
+                    profile_id_dtype: str = 'Int16', stats: dict = None,
+                    track_memory: bool = False) -> pd.DataFrame:
+    """
+    cargar csv completo con el esquema declarado y reportar velocidad y memoria.
+
+    args:
+        file_path (str): ruta del archivo csv.
+        columns (list): columnas a leer; None para leer las 13 columnas.
+        engine (str): 'pyarrow', 'c' o None para elegir el mas rapido instalado.
+        profile_id_dtype (str): tipo de profile_id, por ejemplo 'Int16' o 'category'.
+        stats (dict): diccionario opcional donde guardar el reporte.
+        track_memory (bool): medir el pico de memoria por bloque con tracemalloc.
+
+    returns:
+        pd.DataFrame: dataframe con tipos compactos.
+    """
+    report = {} if stats is None else stats
+    chunks = list(load_data_chunks(file_path, columns=columns, engine=engine,
+                                   profile_id_dtype=profile_id_dtype, stats=report,
+                                   track_memory=track_memory))
+    if chunks:
+        df = pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+    else:
+        df = pd.DataFrame({col: pd.Series(dtype=MOTOR_SCHEMA[col]) for col in _resolve_columns(columns)})
+    del chunks # liberar lista de bloques
+
+    report['dataframe_bytes'] = int(df.memory_usage(deep=True).sum()) # memoria final del dataframe
+    report['float64_bytes'] = int(len(df) * df.shape[1] * np.dtype('float64').itemsize) # equivalente sin esquema
+    print_load_report(report)
+    return df
+
+
+def print_load_report(stats: dict):
+    """
+    mostrar reporte de carga: filas por segundo y memoria.
+
+    args:
+        stats (dict): reporte generado por load_data_chunks o load_data_typed.
+    """
+    print(f"\n--- reporte de carga ({stats.get('engine')}) ---")
+    print(f"filas leidas: {stats.get('rows', 0)} en {stats.get('seconds', 0.0):.2f} s "
+          f"({stats.get('rows_per_second', 0.0):,.0f} filas/s)")
+    if stats.get('peak_memory_bytes') is not None:
+        print(f"pico de memoria al leer un bloque: {stats['peak_memory_bytes'] / 1e6:.1f} mb")
+    if stats.get('arrow_peak_growth_bytes') is not None:
+        print(f"aumento del pico de memoria de arrow: {stats['arrow_peak_growth_bytes'] / 1e6:.1f} mb")
+    if 'dataframe_bytes' in stats:
+        ratio = stats['dataframe_bytes'] / stats['float64_bytes'] if stats['float64_bytes'] else 0.0
+        print(f"memoria del dataframe: {stats['dataframe_bytes'] / 1e6:.1f} mb "
+              f"({ratio:.0%} de la version float64)")
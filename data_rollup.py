@@ -0,0 +1,169 @@
+import math
+
+import pandas as pd
+import numpy as np
+
+from data_loader import SENSOR_COLUMNS
+from profile_store import as_profile_store
+from instrumentation import instrumented
+
+# --- configuracion de la piramide de agregados ---
+DEFAULT_RESOLUTIONS = (1, 10, 60) # segundos por cubeta en cada nivel
+ROLLUP_STATS = ('promedio', 'min', 'max')
+COUNT_COLUMN = 'muestras' # lecturas originales dentro de cada cubeta
+
+
+def _rollup_segments(profile_ids, time_values, counts, stats, resolution):
+    """
+    agregar filas contiguas que caen en la misma sesion y cubeta de tiempo.
+
+    args:
+        profile_ids (np.ndarray): id de sesion de cada fila (sesiones contiguas).
+        time_values (np.ndarray): tiempo de cada fila, creciente dentro de la sesion.
+        counts (np.ndarray): lecturas originales que representa cada fila.
+        stats (dict): columna -> (promedio, min, max) de cada fila.
+        resolution (float): segundos por cubeta.
+
+    returns:
+        pd.DataFrame: una fila por sesion y cubeta.
+    """
+    buckets = np.floor(time_values / resolution) * resolution # inicio de la cubeta
+    if len(buckets) == 0:
+        starts = np.array([], dtype=np.int64)
+    else:
+        changed = (np.diff(buckets) != 0) | (np.diff(profile_ids) != 0)
+        starts = np.concatenate([[0], np.flatnonzero(changed) + 1])
+
+    rollup = {
+        'profile_id': profile_ids[starts],
+        'Tiempo_Segundos': buckets[starts],
+    }
+    if len(starts) == 0:
+        rollup[COUNT_COLUMN] = counts[:0]
+        for col in stats:
+            for stat in ROLLUP_STATS:
+                rollup[f'{col}_{stat}'] = np.array([], dtype=np.float32)
+        return pd.DataFrame(rollup)
+
+    bucket_counts = np.add.reduceat(counts, starts)
+    rollup[COUNT_COLUMN] = bucket_counts
+    for col, (mean, low, high) in stats.items(): # promedio ponderado por lecturas, min de min, max de max
+        weighted = np.add.reduceat(mean.astype(np.float64) * counts, starts)
+        rollup[f'{col}_promedio'] = (weighted / bucket_counts).astype(np.float32)
+        rollup[f'{col}_min'] = np.minimum.reduceat(low, starts)
+        rollup[f'{col}_max'] = np.maximum.reduceat(high, starts)
+    return pd.DataFrame(rollup)
+
+
+def build_rollup(data, resolution: float, columns: list = None) -> pd.DataFrame:
+    """
+    agregar lecturas de 0.5 s en cubetas de tiempo por sesion.
+
+    args:
+        data (pd.DataFrame | ProfileStore): datos limpios con columna 'Tiempo_Segundos'.
+        resolution (float): segundos por cubeta.
+        columns (list): columnas de sensores a agregar; None para todas.
+
+    returns:
+        pd.DataFrame: una fila por sesion y cubeta con promedio/min/max de cada sensor.
+    """
+    store = as_profile_store(data) # las cubetas requieren sesiones contiguas
+    df = store.data
+    columns = [col for col in (SENSOR_COLUMNS if columns is None else columns) if col in df.columns]
+    stats = {}
+    for col in columns:
+        values = df[col].to_numpy()
+        stats[col] = (values, values, values) # cada lectura es su propio promedio, min y max
+    profile_ids = df['profile_id'].to_numpy(dtype=store.profile_ids.dtype)
+    counts = np.ones(len(df), dtype=np.int64)
+    return _rollup_segments(profile_ids, df['Tiempo_Segundos'].to_numpy(), counts, stats, resolution)
+
+
+def coarsen_rollup(rollup: pd.DataFrame, resolution: float) -> pd.DataFrame:
+    """
+    agregar un nivel existente en cubetas mas grandes sin volver a los datos originales.
+
+    args:
+        rollup (pd.DataFrame): nivel generado por build_rollup o coarsen_rollup.
+        resolution (float): segundos por cubeta, multiplo de la resolucion del nivel.
+
+    returns:
+        pd.DataFrame: nivel mas grueso con las mismas columnas.
+    """
+    columns = [col[:-len('_promedio')] for col in rollup.columns if col.endswith('_promedio')]
+    stats = {
+        col: tuple(rollup[f'{col}_{stat}'].to_numpy() for stat in ROLLUP_STATS)
+        for col in columns
+    }
+    return _rollup_segments(rollup['profile_id'].to_numpy(), rollup['Tiempo_Segundos'].to_numpy(),
+                            rollup[COUNT_COLUMN].to_numpy(), stats, resolution)
+
+
+@instrumented('agregados')
+def build_rollup_pyramid(data, resolutions: tuple = DEFAULT_RESOLUTIONS, columns: list = None) -> dict:
+    """
+    construir niveles de agregados por sesion, cada uno a partir del nivel anterior.
+
+    args:
+        data (pd.DataFrame | ProfileStore): datos limpios con columna 'Tiempo_Segundos'.
+        resolutions (tuple): segundos por cubeta de cada nivel.
+        columns (list): columnas de sensores a agregar; None para todas.
+
+    returns:
+        dict: resolucion -> dataframe del nivel, de la mas fina a la mas gruesa.
+    """
+    if data is None:
+        print("no poder construir agregados, el dataframe es nulo.")
+        return {}
+
+    pyramid = {}
+    previous = None
+    for resolution in sorted(resolutions):
+        if previous is not None and math.isclose(resolution / previous, round(resolution / previous)):
+            pyramid[resolution] = coarsen_rollup(pyramid[previous], resolution) # reutilizar nivel fino
+        else:
+            pyramid[resolution] = build_rollup(data, resolution, columns=columns)
+        previous = resolution
+        print(f"nivel de agregados de {resolution} s: {len(pyramid[resolution])} filas.")
+    return pyramid
+
+
+def select_rollup_level(pyramid: dict, start: float, end: float, max_points: int,
+                        profile_ids: list = None):
+    """
+    elegir el nivel con mas detalle que respete el presupuesto de puntos en un rango.
+
+    los puntos de cada nivel se estiman con la duracion de cada sesion, sin recorrer los
+    niveles finos; si ningun nivel cabe en el presupuesto se usa el mas grueso.
+
+    args:
+        pyramid (dict): niveles de build_rollup_pyramid.
+        start (float): inicio del rango en segundos de sesion.
+        end (float): fin del rango en segundos de sesion.
+        max_points (int): numero maximo de filas a devolver.
+        profile_ids (list): sesiones a consultar; None para todas.
+
+    returns:
+        tuple: (resolucion elegida, dataframe filtrado del nivel).
+    """
+    if not pyramid:
+        raise ValueError("la piramide de agregados esta vacia.")
+    resolutions = sorted(pyramid)
+    coarsest = pyramid[resolutions[-1]]
+    # duracion de cada sesion leida del nivel mas pequeño
+    durations = coarsest.groupby('profile_id', sort=False)['Tiempo_Segundos'].max() + resolutions[-1]
+    if profile_ids is not None:
+        durations = durations[durations.index.isin(profile_ids)]
+    overlap = np.clip(np.minimum(durations.to_numpy(), end) - start, 0, None)
+
+    chosen = resolutions[-1]
+    for resolution in resolutions: # de la mas fina a la mas gruesa
+        if np.ceil(overlap / resolution).sum() <= max_points:
+            chosen = resolution
+            break
+
+    level = pyramid[chosen]
+    mask = (level['Tiempo_Segundos'] + chosen > start) & (level['Tiempo_Segundos'] < end)
+    if profile_ids is not None:
+        mask &= level['profile_id'].isin(profile_ids)
+    return chosen, level[mask]
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+import numpy as np
+
+from data_cache import (DEFAULT_CACHE_DIR, DEFAULT_MAX_CACHE_BYTES, FEATURE_CACHE_SUBDIR, source_fingerprint,
+                        load_clean_data_cached, invalidate_cache, evict_cache, _read_manifest, _write_manifest)
+from profile_store import ProfileStore, as_profile_store
+from instrumentation import instrumented
+
+# --- configuracion de las caracteristicas termicas ---
+FEATURE_COLUMNS = ['motor_speed', 'torque', 'i_d', 'i_q', 'u_d', 'u_q', 'coolant', 'ambient'] # entradas medibles del motor
+DEFAULT_WINDOWS = (120, 600) # lecturas de las ventanas moviles (60 s y 5 min a 2 hz)
+DEFAULT_SPANS = (1320, 3360, 6360) # spans de los promedios exponenciales (11, 28 y 53 min)
+DEFAULT_LAGS = (1, 10) # retrasos en lecturas
+FEATURES_FILE = 'features.npy'
+
+
+def _row_positions(store: ProfileStore) -> np.ndarray:
+    """
+    posicion de cada fila dentro de su sesion (0 en la primera lectura).
+    """
+    sizes = store.sizes
+    return np.arange(int(sizes.sum())) - np.repeat(store.starts, sizes)
+
+
+def rolling_mean_std(values: np.ndarray, store: ProfileStore, positions: np.ndarray, window: int):
+    """
+    media y desviacion movil de cada sesion con sumas acumuladas, sin cruzar sesiones.
+
+    la ventana se acorta al inicio de cada sesion (equivale a min_periods=1); con una sola
+    lectura la desviacion es 0. los valores se centran con la media de su sesion antes de
+    acumular para no perder precision en las sumas de cuadrados.
+
+    args:
+        values (np.ndarray): columna completa con sesiones contiguas.
+        store (ProfileStore): indice de sesiones de la columna.
+        positions (np.ndarray): posicion de cada fila dentro de su sesion.
+        window (int): lecturas de la ventana.
+
+    returns:
+        tuple: (media, desviacion estandar con ddof=1) en float64.
+    """
+    sizes = store.sizes
+    values = values.astype(np.float64)
+    profile_mean = np.repeat(np.add.reduceat(values, store.starts) / sizes, sizes)
+    centered = values - profile_mean
+    counts = np.minimum(positions + 1, window) # lecturas dentro de la ventana
+    end = np.arange(1, len(values) + 1)
+    begin = end - counts
+
+    cumulative = np.concatenate([[0.0], np.cumsum(centered)])
+    total = cumulative[end] - cumulative[begin]
+    cumulative = np.concatenate([[0.0], np.cumsum(centered * centered)])
+    total_sq = cumulative[end] - cumulative[begin]
+
+    mean = total / counts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (total_sq - total * mean) / (counts - 1)
+    std = np.sqrt(np.clip(np.where(counts > 1, variance, 0.0), 0.0, None))
+    return mean + profile_mean, std
+
+
+def ewma(values: np.ndarray, store: ProfileStore, positions: np.ndarray, span: float) -> np.ndarray:
+    """
+    promedio exponencial de cada sesion calculado sobre la columna completa.
+
+    el promedio recursivo (adjust=False) se calcula una sola vez de corrido y luego se corrige
+    el arrastre de la sesion anterior: en la primera fila de cada sesion el error es la
+    diferencia con su primera lectura y decae como (1 - alpha) ** posicion.
+
+    args:
+        values (np.ndarray): columna completa con sesiones contiguas.
+        store (ProfileStore): indice de sesiones de la columna.
+        positions (np.ndarray): posicion de cada fila dentro de su sesion.
+        span (float): span del promedio, alpha = 2 / (span + 1).
+
+    returns:
+        np.ndarray: promedio exponencial en float64.
+    """
+    alpha = 2.0 / (span + 1.0)
+    values = values.astype(np.float64)
+    smoothed = pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    carried = smoothed[store.starts] - values[store.starts] # arrastre de la sesion anterior
+    return smoothed - np.repeat(carried, store.sizes) * (1.0 - alpha) ** positions
+
+
+def lag(values: np.ndarray, store: ProfileStore, positions: np.ndarray, periods: int) -> np.ndarray:
+    """
+    valor de `periods` lecturas atras dentro de la sesion; antes de eso la primera lectura.
+    """
+    rows = np.arange(len(values))
+    source = np.where(positions >= periods, rows - periods, rows - positions) # no cruzar al inicio de la sesion
+    return values[source]
+
+
+def feature_names(columns: list = None, windows: tuple = DEFAULT_WINDOWS, spans: tuple = DEFAULT_SPANS,
+                  lags: tuple = DEFAULT_LAGS) -> list:
+    """
+    nombres de las caracteristicas en el orden de las columnas de la matriz.
+    """
+    names = []
+    for col in FEATURE_COLUMNS if columns is None else columns:
+        for window in windows:
+            names += [f'{col}_media_{window}', f'{col}_desviacion_{window}']
+        names += [f'{col}_ewma_{span}' for span in spans]
+        names += [f'{col}_lag_{periods}' for periods in lags]
+    return names
+
+
+@instrumented('caracteristicas')
+def compute_features(data, columns: list = None, windows: tuple = DEFAULT_WINDOWS, spans: tuple = DEFAULT_SPANS,
+                     lags: tuple = DEFAULT_LAGS):
+    """
+    calcular medias y desviaciones moviles, promedios exponenciales y retrasos de todas las
+    sesiones en una pasada vectorizada por columna.
+
+    ninguna ventana cruza el limite de un profile_id. las filas de la matriz siguen el orden
+    de as_profile_store(data).data.
+
+    args:
+        data (pd.DataFrame | ProfileStore): datos limpios.
+        columns (list): columnas de entrada; None para FEATURE_COLUMNS.
+        windows (tuple): lecturas de cada ventana movil.
+        spans (tuple): spans de los promedios exponenciales.
+        lags (tuple): retrasos en lecturas.
+
+    returns:
+        tuple: (matriz float32 de filas x caracteristicas en orden de columnas, lista de nombres).
+    """
+    store = as_profile_store(data)
+    df = store.data
+    columns = [col for col in (FEATURE_COLUMNS if columns is None else columns) if col in df.columns]
+    names = feature_names(columns, windows, spans, lags)
+    features = np.empty((len(df), len(names)), dtype=np.float32, order='F') # cada caracteristica contigua
+    if len(df) == 0:
+        return features, names
+
+    positions = _row_positions(store)
+    j = 0
+    for col in columns: # los temporales float64 son de una sola columna a la vez
+        values = df[col].to_numpy()
+        for window in windows:
+            features[:, j], features[:, j + 1] = rolling_mean_std(values, store, positions, window)
+            j += 2
+        for span in spans:
+            features[:, j] = ewma(values, store, positions, span)
+            j += 1
+        for periods in lags:
+            features[:, j] = lag(values, store, positions, periods)
+            j += 1
+    print(f"caracteristicas calcular: {len(names)} columnas para {len(df)} filas "
+          f"({features.nbytes / 1e6:.1f} mb en float32).")
+    return features, names
+
+
+def features_to_frame(features: np.ndarray, names: list, index=None) -> pd.DataFrame:
+    """
+    envolver la matriz de caracteristicas en un dataframe sin copiarla.
+    """
+    return pd.DataFrame(features, columns=names, index=index, copy=False)
+
+
+def load_features_cached(file_path: str, columns: list = None, windows: tuple = DEFAULT_WINDOWS,
+                         spans: tuple = DEFAULT_SPANS, lags: tuple = DEFAULT_LAGS,
+                         cache_dir: str = DEFAULT_CACHE_DIR, max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+    """
+    devolver caracteristicas desde la cache, o calcularlas y guardarlas si no existen.
+
+    la clave combina la huella del csv y la configuracion de caracteristicas; la matriz se
+    abre mapeada en memoria. las filas siguen el orden del dataset limpio en cache. las
+    entradas cuentan en el limite de la cache y se invalidan junto con el dataset de su csv.
+
+    args:
+        file_path (str): archivo csv de origen.
+        columns (list): columnas de entrada; None para FEATURE_COLUMNS.
+        windows (tuple): lecturas de cada ventana movil.
+        spans (tuple): spans de los promedios exponenciales.
+        lags (tuple): retrasos en lecturas.
+        cache_dir (str): carpeta raiz de la cache.
+        max_cache_bytes (int): tamaño maximo de la cache; None para no expulsar.
+
+    returns:
+        tuple: (matriz float32, lista de nombres, ProfileStore del dataset limpio).
+    """
+    fingerprint = source_fingerprint(file_path, cache_dir)
+    df = load_clean_data_cached(file_path, cache_dir=cache_dir, max_cache_bytes=max_cache_bytes,
+                                fingerprint=fingerprint)
+    if df is None:
+        return None
+    store = ProfileStore.from_dataframe(df, sort=False) # la cache ya agrupa las sesiones
+
+    config = {
+        'columns': list(FEATURE_COLUMNS if columns is None else columns),
+        'windows': list(windows), 'spans': list(spans), 'lags': list(lags),
+    }
+    key_material = json.dumps([fingerprint['key'], config], sort_keys=True).encode()
+    key = hashlib.sha256(key_material).hexdigest()[:24]
+    entry_dir = os.path.join(cache_dir, FEATURE_CACHE_SUBDIR, key)
+
+    manifest = _read_manifest(entry_dir)
+    if manifest is not None and manifest.get('sha256') == fingerprint['sha256']:
+        features = np.load(os.path.join(entry_dir, FEATURES_FILE), mmap_mode='r')
+        try:
+            os.utime(entry_dir) # registrar uso para la politica de expulsion
+        except OSError: # otro proceso expulso la entrada; la matriz ya abierta sigue valida
+            pass
+        return features, manifest['names'], store
+
+    features, names = compute_features(store, **config)
+    tmp_dir = entry_dir + f'.tmp-{os.getpid()}'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, FEATURES_FILE), features)
+    manifest = dict(fingerprint)
+    manifest.update({'key': key, 'source_key': fingerprint['key'], 'config': config, 'names': names,
+                     'rows': int(len(features)), 'bytes': int(features.nbytes), 'created': time.time()})
+    _write_manifest(tmp_dir, manifest)
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir) # publicar la entrada completa de una vez
+
+    # borrar matrices de versiones anteriores del mismo archivo y respetar el limite de tamaño
+    invalidate_cache(file_path, cache_dir=cache_dir, keep_key=fingerprint['key'])
+    if max_cache_bytes is not None:
+        evict_cache(cache_dir, max_cache_bytes, protect_key=key)
+    print(f"cache de caracteristicas guardar en '{entry_dir}'.")
+    return features, names, store
@@ -0,0 +1,321 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import shutil
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import numpy as np
+
+from data_loader import load_data_typed
+from data_cleaner import clean_and_prepare_data
+from data_cache import load_clean_data_cached
+from profile_store import ProfileStore
+from profile_summary import summarize_profiles
+from correlation_engine import CorrelationAccumulator, accumulate_correlations
+from quantile_sketch import DEFAULT_K, DescribeSketch, accumulate_describe
+from data_exporter import export_powerbi_stream
+
+# --- configuracion del modo flota ---
+MOTOR_COLUMN = 'motor' # nombre del motor que antecede al profile_id en los resultados de la flota
+DEFAULT_EXPORT_FORMAT = 'parquet' # 'parquet', 'csv' o 'csv.gz'
+FLEET_MANIFEST = '_flota.json' # con '_' inicial los lectores de datasets parquet lo ignoran
+
+
+def discover_files(source) -> list:
+    """
+    listar los csv de la flota desde una carpeta, un patron glob o una lista de rutas.
+
+    returns:
+        list: rutas de archivos csv ordenadas.
+    """
+    if isinstance(source, (list, tuple)):
+        paths = []
+        for item in source:
+            paths.extend(discover_files(item))
+        return sorted(set(paths))
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, '*.csv')))
+    return sorted(path for path in glob.glob(source) if os.path.isfile(path))
+
+
+def motor_names(paths: list) -> dict:
+    """
+    nombre unico de cada motor a partir del nombre de su archivo (sin extension).
+
+    returns:
+        dict: ruta -> nombre del motor.
+    """
+    names = {}
+    used = {}
+    for path in paths:
+        base = os.path.splitext(os.path.basename(path))[0]
+        used[base] = used.get(base, 0) + 1
+        names[path] = base if used[base] == 1 else f'{base}_{used[base]}' # archivos homonimos en otras carpetas
+    return names
+
+
+def _export_target(export_dir: str, motor: str, export_format: str) -> str:
+    """
+    ruta de exportacion de un motor: carpeta 'motor=<nombre>' en parquet o un csv por motor.
+    """
+    if export_format == 'parquet':
+        return os.path.join(export_dir, f'{MOTOR_COLUMN}={motor}')
+    return os.path.join(export_dir, f'{motor}.{export_format}')
+
+
+def analyze_motor_file(file_path: str, motor: str, export_dir: str = None,
+                       export_format: str = DEFAULT_EXPORT_FORMAT, k: int = DEFAULT_K,
+                       use_cache: bool = False) -> dict:
+    """
+    limpiar y analizar un archivo de un motor y devolver resultados parciales combinables.
+
+    se ejecuta en un proceso de trabajo: la salida de texto se captura y cualquier error se
+    devuelve en el resultado en lugar de propagarse, para no detener al resto de la flota.
+
+    args:
+        file_path (str): csv del motor.
+        motor (str): nombre del motor.
+        export_dir (str): carpeta de exportacion de la flota; None para no exportar.
+        export_format (str): 'parquet', 'csv' o 'csv.gz'.
+        k (int): precision de los sketches de cuantiles.
+        use_cache (bool): usar la cache de datasets limpios.
+
+    returns:
+        dict: resumen de sesiones, acumuladores de correlacion y de estadisticas, reporte de
+            exportacion y texto capturado; o el error si el archivo fallo.
+    """
+    start = time.perf_counter()
+    output = io.StringIO()
+    result = {'motor': motor, 'file_path': file_path, 'pid': os.getpid()}
+    try:
+        with contextlib.redirect_stdout(output):
+            if use_cache:
+                df = load_clean_data_cached(file_path)
+            else:
+                df = clean_and_prepare_data(load_data_typed(file_path))
+            if df is None or len(df) == 0:
+                raise ValueError("el archivo no tiene filas validas despues de la limpieza.")
+            store = ProfileStore.from_dataframe(df)
+            del df
+
+            result['rows'] = len(store.data)
+            result['summary'] = summarize_profiles(store)
+            result['correlation'], _ = accumulate_correlations(store)
+            result['describe'], _ = accumulate_describe(store, k=k)
+            if export_dir is not None:
+                target = _export_target(export_dir, motor, export_format)
+                if export_format == 'parquet': # no mezclar con sesiones de una corrida o intento anterior
+                    shutil.rmtree(target, ignore_errors=True)
+                else: # en csv el motor va como columna; en parquet en la carpeta
+                    store.data[MOTOR_COLUMN] = pd.Categorical.from_codes(
+                        np.zeros(len(store.data), dtype=np.int8), [motor]) # una categoria, sin copiar textos
+                result['export'] = export_powerbi_stream(store, target)
+    except Exception as exc:
+        result['error'] = f'{type(exc).__name__}: {exc}'
+        result['traceback'] = traceback.format_exc()
+    result['log'] = output.getvalue()
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def _failed_result(path: str, motor: str, exc: Exception) -> dict:
+    """
+    resultado de un archivo cuyo proceso de trabajo termino de forma abrupta.
+    """
+    return {'motor': motor, 'file_path': path, 'error': f'{type(exc).__name__}: {exc}', 'log': '', 'seconds': 0.0}
+
+
+def _analyze_isolated(*args) -> dict:
+    """
+    analizar un archivo en su propio proceso: si el proceso muere solo falla ese archivo.
+    """
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(analyze_motor_file, *args).result()
+
+
+def merge_fleet_results(results: list) -> dict:
+    """
+    combinar resultados parciales de cada motor de forma exacta.
+
+    las sesiones se identifican por (motor, profile_id); la correlacion y las estadisticas
+    globales se obtienen combinando los acumuladores, sin volver a leer los datos.
+
+    args:
+        results (list): resultados de analyze_motor_file.
+
+    returns:
+        dict: resumen de sesiones de la flota, matriz de correlacion global y por motor,
+            estadisticas descriptivas globales y por motor, exportaciones y errores.
+    """
+    results = sorted(results, key=lambda r: r['motor']) # mismo orden sin importar cual termino primero
+    succeeded = [r for r in results if 'error' not in r]
+    failed = [r for r in results if 'error' in r]
+    fleet = {
+        'motors': [r['motor'] for r in succeeded],
+        'errors': {r['motor']: r['error'] for r in failed},
+        'exports': {r['motor']: r['export'] for r in succeeded if r.get('export')},
+        'summary': None, 'correlation': None, 'describe': None,
+        'motor_correlations': {}, 'motor_describe': {},
+    }
+    if not succeeded:
+        return fleet
+
+    fleet['summary'] = pd.concat({r['motor']: r['summary'] for r in succeeded}, names=[MOTOR_COLUMN])
+    first = succeeded[0]
+    correlation = CorrelationAccumulator(first['correlation'].columns)
+    describe = DescribeSketch(first['describe'].columns, first['describe'].k)
+    for r in succeeded: # los acumuladores se combinan de forma exacta en cualquier orden
+        fleet['motor_correlations'][r['motor']] = r['correlation'].correlation()
+        fleet['motor_describe'][r['motor']] = r['describe'].describe()
+        correlation.merge(r['correlation'])
+        describe.merge(r['describe'])
+    fleet['correlation'] = correlation.correlation()
+    fleet['describe'] = describe.describe()
+    return fleet
+
+
+def run_fleet_analysis(source, export_dir: str = None, export_format: str = DEFAULT_EXPORT_FORMAT,
+                       workers: int = None, k: int = DEFAULT_K, use_cache: bool = False,
+                       verbose: bool = False) -> dict:
+    """
+    analizar todos los csv de una flota en un pool de procesos y combinar los resultados.
+
+    los archivos mas grandes se envian primero para repartir mejor la carga; un archivo que
+    falla se reporta y el resto continua. si un proceso de trabajo muere (por ejemplo por falta
+    de memoria) el pool completo se rompe: los archivos sin terminar se reintentan cada uno en
+    su propio proceso y solo se reporta como fallido el que vuelve a terminar su proceso.
+
+    args:
+        source: carpeta, patron glob o lista de rutas de csv.
+        export_dir (str): carpeta de exportacion para power bi; None para no exportar.
+        export_format (str): 'parquet' (particiones motor=/id_sesion_prueba=, con el motor como
+            particion de texto), 'csv' o 'csv.gz' (un archivo por motor con columna 'motor').
+        workers (int): procesos de trabajo; None para uno por nucleo.
+        k (int): precision de los sketches de cuantiles.
+        use_cache (bool): usar la cache de datasets limpios en cada proceso.
+        verbose (bool): mostrar la salida capturada de cada archivo.
+
+    returns:
+        dict: resultado de merge_fleet_results con tiempos de la corrida.
+    """
+    paths = discover_files(source)
+    if not paths:
+        print(f"error: no encontrar archivos csv en '{source}'.")
+        return None
+    names = motor_names(paths)
+    paths.sort(key=os.path.getsize, reverse=True) # mas grandes primero
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if export_dir is not None:
+        os.makedirs(export_dir, exist_ok=True)
+
+    print(f"\n--- analisis de flota: {len(paths)} archivo(s) con {workers} proceso(s) ---")
+    start = time.perf_counter()
+    jobs = {path: (path, names[path], export_dir, export_format, k, use_cache) for path in paths}
+    results = []
+
+    def report(result):
+        results.append(result)
+        if 'error' in result:
+            print(f"  error en '{result['file_path']}': {result['error']}")
+        else:
+            print(f"  motor {result['motor']}: {result['rows']} filas, {len(result['summary'])} sesiones "
+                  f"en {result['seconds']:.2f} s.")
+        if verbose and result['log']:
+            print(result['log'])
+
+    unfinished = [] # archivos interrumpidos porque un proceso del pool murio
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(analyze_motor_file, *jobs[path]): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                report(future.result())
+            except BrokenProcessPool: # el pool queda inutilizable para todos sus archivos pendientes
+                unfinished.append(path)
+            except Exception as exc:
+                report(_failed_result(path, names[path], exc))
+
+    if unfinished:
+        # reintentar cada archivo en su propio proceso para aislar al que termina el proceso
+        unfinished.sort(key=paths.index)
+        print(f"  un proceso de trabajo termino de forma abrupta: reintentar {len(unfinished)} archivo(s) "
+              f"en procesos separados.")
+        with ThreadPoolExecutor(max_workers=workers) as threads:
+            futures = {threads.submit(_analyze_isolated, *jobs[path]): path for path in unfinished}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    report(future.result())
+                except Exception as exc: # el archivo vuelve a terminar su proceso
+                    report(_failed_result(path, names[path], exc))
+
+    fleet = merge_fleet_results(results)
+    fleet['seconds'] = time.perf_counter() - start
+    fleet['worker_seconds'] = sum(r['seconds'] for r in results)
+    print_fleet_report(fleet)
+    if export_dir is not None:
+        write_fleet_manifest(fleet, export_dir)
+    return fleet
+
+
+def print_fleet_report(fleet: dict):
+    """
+    mostrar resumen de la flota en la terminal.
+    """
+    print("\n--- resumen de la flota ---")
+    print(f"motores analizados: {len(fleet['motors'])}, con error: {len(fleet['errors'])}")
+    for motor, error in fleet['errors'].items():
+        print(f"  {motor}: {error}")
+    if fleet['summary'] is None:
+        return
+    summary = fleet['summary']
+    durations = summary['duracion_segundos']
+    print(f"sesiones totales: {len(summary)}, filas totales: {int(summary['filas'].sum())}")
+    print(f"duracion de sesiones: promedio {durations.mean():.2f} s, minima {durations.min():.2f} s, "
+          f"maxima {durations.max():.2f} s")
+    print("\nsesiones por motor:")
+    print(summary.groupby(level=MOTOR_COLUMN, sort=True).agg(
+        sesiones=('filas', 'size'), filas=('filas', 'sum'), pm_max=('pm_max', 'max')).to_string())
+    print("\ncorrelacion de la flota con la temperatura del rotor (pm):")
+    print(fleet['correlation']['pm'].drop('pm').sort_values(ascending=False).to_string())
+    if fleet.get('seconds'):
+        print(f"\ntiempo total {fleet['seconds']:.2f} s (suma de tiempos por archivo {fleet['worker_seconds']:.2f} s).")
+
+
+def write_fleet_manifest(fleet: dict, export_dir: str) -> str:
+    """
+    guardar junto a la exportacion un manifiesto con los archivos de cada motor y los errores.
+    """
+    manifest = {
+        'motors': fleet['motors'],
+        'errors': fleet['errors'],
+        'exports': fleet['exports'],
+        'sessions': int(len(fleet['summary'])) if fleet['summary'] is not None else 0,
+    }
+    path = os.path.join(export_dir, FLEET_MANIFEST)
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2, default=str)
+    return path
+
+
+# --- ejecucion desde linea de comandos ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='analisis de una flota de motores en paralelo.')
+    parser.add_argument('source', nargs='+', help='carpeta, patron glob o archivos csv')
+    parser.add_argument('--export-dir', help='carpeta de exportacion para power bi')
+    parser.add_argument('--format', default=DEFAULT_EXPORT_FORMAT, choices=['parquet', 'csv', 'csv.gz'],
+                        help='formato de exportacion')
+    parser.add_argument('--workers', type=int, help='procesos de trabajo (por defecto uno por nucleo)')
+    parser.add_argument('--cache', action='store_true', help='usar la cache de datasets limpios')
+    parser.add_argument('--verbose', action='store_true', help='mostrar la salida de cada archivo')
+    args = parser.parse_args()
+
+    run_fleet_analysis(args.source, export_dir=args.export_dir, export_format=args.format,
+                       workers=args.workers, use_cache=args.cache, verbose=args.verbose)
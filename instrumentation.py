@@ -0,0 +1,315 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# --- configuracion por variables de entorno ---
+# MOTOR_PROFILING=1 activa la instrumentacion; MOTOR_PROFILING_MEMORY=0 omite tracemalloc
+PROFILING_ENV = 'MOTOR_PROFILING'
+MEMORY_ENV = 'MOTOR_PROFILING_MEMORY'
+REPORT_ENV = 'MOTOR_PROFILING_REPORT'
+DEFAULT_REPORT_PATH = 'motor_profiling_trace.json'
+
+
+class _State:
+    """
+    estado global de la instrumentacion.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.track_memory = False
+        self.records = [] # un registro por etapa terminada
+        self.lock = threading.Lock()
+        self.local = threading.local() # pila de etapas abiertas en cada hilo
+        self.open_stages = [] # etapas abiertas en todos los hilos
+        self.origin = time.perf_counter() # referencia de tiempo para la traza
+
+
+_state = _State()
+
+
+class _NoOpStage:
+    """
+    etapa vacia que se devuelve cuando la instrumentacion esta apagada (sin costo).
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_rows(self, rows):
+        pass
+
+
+_NO_OP_STAGE = _NoOpStage()
+
+
+class _Stage:
+    """
+    medir una etapa: tiempo de reloj, tiempo de cpu del hilo, filas y memoria.
+
+    tracemalloc mide todo el proceso y tiene un solo pico, asi que la memoria solo se reporta
+    para etapas que no se superponen con etapas de otros hilos; en las demas (por ejemplo las
+    de un pool de hilos) los campos de memoria quedan en None y 'memory_overlapped'
+    en True. el pico solo se reinicia cuando no hay etapas abiertas en otros hilos.
+    """
+
+    def __init__(self, name: str, rows: int = None, profile_id=None):
+        self.name = name
+        self.rows = rows
+        self.profile_id = profile_id
+        self.child_peak = 0
+        self.overlapped = False
+        self.thread_id = threading.get_ident()
+
+    def __enter__(self):
+        stack = getattr(_state.local, 'stack', None)
+        if stack is None:
+            stack = _state.local.stack = []
+        self.memory = _state.track_memory and tracemalloc.is_tracing()
+        with _state.lock:
+            if any(stage.thread_id != self.thread_id for stage in _state.open_stages):
+                self.overlapped = True
+                for stage in _state.open_stages: # todas las etapas abiertas comparten ahora el pico
+                    stage.overlapped = True
+            _state.open_stages.append(self)
+            if self.memory and not self.overlapped:
+                current, peak = tracemalloc.get_traced_memory()
+                if stack: # conservar el pico del padre antes de reiniciarlo para esta etapa
+                    stack[-1].child_peak = max(stack[-1].child_peak, peak)
+                tracemalloc.reset_peak() # ninguna etapa de otro hilo esta midiendo
+                self.start_memory = current
+        self.depth = len(stack)
+        stack.append(self)
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.thread_time()
+        return self
+
+    def set_rows(self, rows):
+        """
+        indicar las filas procesadas cuando solo se conocen al terminar (por ejemplo al cargar).
+        """
+        if self.rows is None:
+            self.rows = rows
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.thread_time() - self.start_cpu
+        _state.local.stack.pop()
+        record = {
+            'name': self.name,
+            'profile_id': self.profile_id,
+            'rows': self.rows,
+            'start_seconds': self.start_wall - _state.origin,
+            'wall_seconds': wall,
+            'cpu_seconds': cpu,
+            'rows_per_second': self.rows / wall if self.rows and wall > 0 else None,
+            'peak_memory_bytes': None,
+            'allocated_bytes': None,
+            'memory_overlapped': self.memory and self.overlapped,
+            'depth': self.depth,
+            'thread_id': self.thread_id,
+            'pid': os.getpid(),
+            'error': exc[0].__name__ if exc[0] is not None else None,
+        }
+        with _state.lock:
+            _state.open_stages.remove(self)
+            if self.memory and not self.overlapped and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, self.child_peak)
+                record['peak_memory_bytes'] = peak - self.start_memory # pico sobre la memoria al entrar
+                record['allocated_bytes'] = current - self.start_memory # memoria retenida al salir
+                stack = _state.local.stack
+                if stack:
+                    stack[-1].child_peak = max(stack[-1].child_peak, peak)
+            _state.records.append(record)
+        return False
+
+
+def enable(track_memory: bool = True):
+    """
+    activar la instrumentacion.
+
+    args:
+        track_memory (bool): medir memoria con tracemalloc (agrega costo a cada asignacion).
+    """
+    _state.enabled = True
+    _state.track_memory = track_memory
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    """
+    apagar la instrumentacion (los registros se conservan hasta reset).
+    """
+    _state.enabled = False
+    if _state.track_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _state.track_memory = False
+
+
+def is_enabled() -> bool:
+    return _state.enabled
+
+
+def is_tracking_memory() -> bool:
+    """
+    indicar si la instrumentacion esta midiendo memoria con tracemalloc.
+    """
+    return _state.enabled and _state.track_memory and tracemalloc.is_tracing()
+
+
+def reset():
+    """
+    borrar registros acumulados.
+    """
+    with _state.lock:
+        _state.records = []
+        _state.origin = time.perf_counter()
+
+
+def get_records() -> list:
+    """
+    devolver copia de los registros de etapas terminadas.
+    """
+    with _state.lock:
+        return list(_state.records)
+
+
+def track_stage(name: str, rows: int = None, profile_id=None):
+    """
+    medir un bloque de codigo como etapa: `with track_stage('limpiar', rows=n): ...`.
+
+    args:
+        name (str): nombre de la etapa.
+        rows (int): filas procesadas, para calcular filas por segundo.
+        profile_id: sesion a la que corresponde la medicion, si aplica.
+
+    returns:
+        contexto que mide la etapa, o uno vacio si la instrumentacion esta apagada.
+    """
+    if not _state.enabled:
+        return _NO_OP_STAGE
+    return _Stage(name, rows, profile_id)
+
+
+def _count_rows(obj):
+    """
+    filas de un dataframe o de un ProfileStore, o None si no aplica.
+    """
+    frame = getattr(obj, 'data', obj)
+    shape = getattr(frame, 'shape', None)
+    return int(shape[0]) if shape else None
+
+
+def instrumented(name: str):
+    """
+    decorador que mide la funcion como etapa; las filas se toman del primer argumento
+    (posicional o por nombre) o, si no es un dataframe, del resultado.
+
+    args:
+        name (str): nombre de la etapa.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled: # camino rapido: solo una comprobacion
+                return func(*args, **kwargs)
+            first = args[0] if args else next(iter(kwargs.values()), None)
+            with _Stage(name, _count_rows(first)) as stage:
+                result = func(*args, **kwargs)
+                stage.set_rows(_count_rows(result))
+                return result
+        return wrapper
+    return decorator
+
+
+def summarize_records(records: list = None) -> dict:
+    """
+    agregar registros por nombre de etapa.
+
+    returns:
+        dict: nombre -> llamadas, tiempos totales, filas, pico de memoria maximo y llamadas
+            sin memoria por superponerse con etapas de otros hilos.
+    """
+    summary = {}
+    for record in get_records() if records is None else records:
+        entry = summary.setdefault(record['name'], {
+            'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows': None, 'peak_memory_bytes': None,
+            'memory_overlapped': 0,
+        })
+        entry['calls'] += 1
+        entry['wall_seconds'] += record['wall_seconds']
+        entry['cpu_seconds'] += record['cpu_seconds']
+        if record['rows'] is not None:
+            entry['rows'] = (entry['rows'] or 0) + record['rows']
+        if record['peak_memory_bytes'] is not None:
+            entry['peak_memory_bytes'] = max(entry['peak_memory_bytes'] or 0, record['peak_memory_bytes'])
+        entry['memory_overlapped'] += bool(record.get('memory_overlapped'))
+    return summary
+
+
+def write_report(file_path: str = None) -> str:
+    """
+    escribir reporte json en formato de traza de chrome (chrome://tracing, perfetto).
+
+    ademas de 'traceEvents' incluye los registros completos ('stages') y el resumen por etapa.
+
+    args:
+        file_path (str): archivo de salida; None para usar MOTOR_PROFILING_REPORT o el valor por defecto.
+
+    returns:
+        str: ruta del archivo escrito.
+    """
+    file_path = file_path or os.environ.get(REPORT_ENV, DEFAULT_REPORT_PATH)
+    records = get_records()
+    events = []
+    for record in records:
+        label = record['name'] if record['profile_id'] is None else f"{record['name']} [{record['profile_id']}]"
+        events.append({
+            'name': label,
+            'cat': 'etapa',
+            'ph': 'X', # evento completo con duracion
+            'ts': record['start_seconds'] * 1e6, # microsegundos
+            'dur': record['wall_seconds'] * 1e6,
+            'pid': record['pid'],
+            'tid': record['thread_id'],
+            'args': {key: record[key] for key in ('rows', 'cpu_seconds', 'peak_memory_bytes', 'allocated_bytes',
+                                                  'memory_overlapped', 'error')},
+        })
+    report = {
+        'traceEvents': events,
+        'displayTimeUnit': 'ms',
+        'stages': records,
+        'summary': summarize_records(records),
+    }
+    with open(file_path, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=1, default=str)
+    return file_path
+
+
+def print_report(records: list = None):
+    """
+    mostrar resumen por etapa en la terminal.
+    """
+    summary = summarize_records(records)
+    print("\n--- reporte de instrumentacion por etapa ---")
+    for name, entry in sorted(summary.items(), key=lambda item: -item[1]['wall_seconds']):
+        memory = entry['peak_memory_bytes']
+        memory_text = f", pico {memory / 1e6:.1f} mb" if memory is not None else ''
+        if entry['memory_overlapped']: # el pico de tracemalloc es del proceso: no atribuirlo a una etapa
+            memory_text += f", memoria no disponible en {entry['memory_overlapped']} llamada(s) concurrente(s)"
+        rows_text = f", {entry['rows']} filas" if entry['rows'] is not None else ''
+        print(f"  {name}: {entry['calls']} llamada(s), {entry['wall_seconds']:.3f} s reloj, "
+              f"{entry['cpu_seconds']:.3f} s cpu{rows_text}{memory_text}")
+
+
+# activar desde el entorno sin cambiar codigo: MOTOR_PROFILING=1 python analisis.py
+if os.environ.get(PROFILING_ENV, '') not in ('', '0'):
+    enable(track_memory=os.environ.get(MEMORY_ENV, '1') != '0')
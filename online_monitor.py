@@ -0,0 +1,417 @@
+import argparse
+import collections
+import csv
+import math
+import os
+import socket
+import sys
+import time
+
+import pandas as pd
+import numpy as np
+
+from data_loader import SENSOR_COLUMNS, MOTOR_COLUMNS
+
+# --- configuracion del monitoreo en linea ---
+SAMPLE_SECONDS = 0.5 # lecturas a 2 hz, igual que assign_session_time
+DEFAULT_THRESHOLDS = {'pm': 100.0, 'stator_winding': 120.0} # °c a partir de los cuales alertar
+DEFAULT_HYSTERESIS = 2.0 # °c por debajo del umbral para dar la alerta por terminada
+DEFAULT_HALFLIFE = 120 # lecturas (60 s) de vida media de la correlacion exponencial con pm
+DEFAULT_POLL_SECONDS = 0.25 # espera entre lecturas del archivo seguido con tail
+MAX_ALERT_HISTORY = 1000 # alertas recientes que se conservan en memoria
+CORRELATION_TARGET = 'pm'
+
+
+class _ProfileState:
+    """
+    estadisticos acumulados de una sesion: memoria constante sin importar las lecturas.
+    """
+
+    __slots__ = ('n', 'mean', 'm2', 'low', 'high', 'ew_mean', 'ew_var', 'ew_cov', 'active_alerts', 'last')
+
+    def __init__(self, k: int):
+        self.n = 0 # lecturas validas de la sesion
+        self.mean = np.zeros(k) # media de welford
+        self.m2 = np.zeros(k) # suma de cuadrados de desviaciones de welford
+        self.low = np.full(k, np.inf)
+        self.high = np.full(k, -np.inf)
+        self.ew_mean = np.zeros(k) # media exponencial
+        self.ew_var = np.zeros(k) # varianza exponencial
+        self.ew_cov = np.zeros(k) # covarianza exponencial de cada columna con pm
+        self.active_alerts = set() # columnas con alerta abierta
+        self.last = None # ultima lectura
+
+
+class OnlineMonitor:
+    """
+    monitorear lecturas del motor una por una a medida que llegan.
+
+    aplica la misma semantica que clean_and_prepare_data: las lecturas con algun valor nulo
+    se descartan y 'Tiempo_Segundos' es la posicion de la lectura valida dentro de su sesion
+    por 0.5 s. por sesion mantiene min/max/media/desviacion exactos (welford) y una
+    correlacion exponencial de cada sensor con pm; el umbral de alerta se revisa antes de
+    actualizar los estadisticos para reducir la latencia.
+    """
+
+    def __init__(self, columns: list = None, thresholds: dict = None, hysteresis: float = DEFAULT_HYSTERESIS,
+                 halflife: float = DEFAULT_HALFLIFE, on_alert=None):
+        """
+        args:
+            columns (list): orden de las columnas de cada linea sin encabezado; None para el del csv.
+            thresholds (dict): columna -> umbral de alerta; None para DEFAULT_THRESHOLDS.
+            hysteresis (float): margen bajo el umbral para cerrar una alerta.
+            halflife (float): vida media en lecturas de la correlacion exponencial.
+            on_alert (callable): funcion que recibe cada alerta; None para imprimirla.
+        """
+        self.sensor_columns = list(SENSOR_COLUMNS)
+        self.thresholds = dict(DEFAULT_THRESHOLDS if thresholds is None else thresholds)
+        unknown = [col for col in self.thresholds if col not in self.sensor_columns]
+        if unknown:
+            raise ValueError(f"no existir columnas para alertar: {unknown}")
+        self.hysteresis = hysteresis
+        self.alpha = 1 - math.exp(math.log(0.5) / halflife) # peso de cada lectura nueva
+        self.on_alert = print_alert if on_alert is None else on_alert
+        self.set_columns(MOTOR_COLUMNS if columns is None else columns)
+        self._target = self.sensor_columns.index(CORRELATION_TARGET)
+        self._alert_index = {col: self.sensor_columns.index(col) for col in self.thresholds}
+        self.profiles = {} # profile_id -> _ProfileState
+        self.readings = 0 # lecturas recibidas
+        self.dropped = 0 # lecturas descartadas por nulos o formato
+        self.alerts = collections.deque(maxlen=MAX_ALERT_HISTORY) # historial acotado de alertas
+        self.alert_count = 0
+
+    def set_columns(self, columns: list):
+        """
+        fijar el orden de las columnas de las lineas (por ejemplo al leer un encabezado).
+        """
+        missing = [col for col in MOTOR_COLUMNS if col not in columns]
+        if missing:
+            raise ValueError(f"faltar columnas en el flujo: {missing}")
+        self.columns = list(columns)
+        self._positions = [self.columns.index(col) for col in self.sensor_columns] # sensores en orden fijo
+        self._profile_position = self.columns.index('profile_id')
+
+    def process_line(self, line: str) -> list:
+        """
+        procesar una linea csv (con o sin comillas); un encabezado cambia el orden de las columnas.
+
+        returns:
+            list: alertas generadas por la lectura.
+        """
+        fields = [field.strip() for field in next(csv.reader([line]), [])] # quita comillas como en el csv de pandas
+        if not fields or fields == ['']:
+            return []
+        try:
+            parsed = [float(field) if field else math.nan for field in fields]
+        except ValueError:
+            if 'profile_id' in fields: # encabezado del archivo o del flujo
+                self.set_columns(fields)
+            else:
+                self.readings += 1
+                self.dropped += 1
+            return []
+        if len(parsed) != len(self.columns):
+            self.readings += 1
+            self.dropped += 1
+            return []
+        values = np.array([parsed[pos] for pos in self._positions])
+        return self.update(values, parsed[self._profile_position])
+
+    def update(self, values: np.ndarray, profile_id) -> list:
+        """
+        agregar una lectura de sensores (en el orden de SENSOR_COLUMNS).
+
+        args:
+            values (np.ndarray): valores de los sensores.
+            profile_id: id de la sesion.
+
+        returns:
+            list: alertas generadas por la lectura.
+        """
+        self.readings += 1
+        if np.isnan(values).any() or profile_id is None or math.isnan(profile_id): # igual que dropna
+            self.dropped += 1
+            return []
+
+        state = self.profiles.get(profile_id)
+        if state is None:
+            state = self.profiles[profile_id] = _ProfileState(len(self.sensor_columns))
+        elapsed = state.n * SAMPLE_SECONDS # 'Tiempo_Segundos' de esta lectura
+
+        alerts = []
+        for col, index in self._alert_index.items(): # revisar umbrales antes de actualizar estadisticos
+            value, threshold = values[index], self.thresholds[col]
+            if col not in state.active_alerts and value >= threshold:
+                state.active_alerts.add(col)
+                alerts.append({'tipo': 'alerta', 'profile_id': profile_id, 'Tiempo_Segundos': elapsed,
+                               'columna': col, 'valor': float(value), 'umbral': threshold})
+            elif col in state.active_alerts and value < threshold - self.hysteresis:
+                state.active_alerts.discard(col)
+                alerts.append({'tipo': 'normalizado', 'profile_id': profile_id, 'Tiempo_Segundos': elapsed,
+                               'columna': col, 'valor': float(value), 'umbral': threshold})
+        for alert in alerts:
+            self.alerts.append(alert)
+            self.alert_count += 1
+            self.on_alert(alert)
+
+        # welford para media y varianza exactas
+        state.n += 1
+        delta = values - state.mean
+        state.mean += delta / state.n
+        state.m2 += delta * (values - state.mean)
+        np.minimum(state.low, values, out=state.low)
+        np.maximum(state.high, values, out=state.high)
+
+        # media, varianza y covarianza con pm ponderadas exponencialmente
+        if state.n == 1:
+            state.ew_mean[:] = values
+        else:
+            ew_delta = values - state.ew_mean
+            state.ew_cov = (1 - self.alpha) * (state.ew_cov + self.alpha * ew_delta * ew_delta[self._target])
+            state.ew_var = (1 - self.alpha) * (state.ew_var + self.alpha * ew_delta * ew_delta)
+            state.ew_mean += self.alpha * ew_delta
+        state.last = values
+        return alerts
+
+    def run(self, lines, report_seconds: float = None) -> 'OnlineMonitor':
+        """
+        procesar lineas de cualquier fuente hasta que se agote.
+
+        args:
+            lines (iterable): lineas csv (tail_csv, replay_csv, iter_stream_lines, iter_socket_lines).
+            report_seconds (float): cada cuantos segundos imprimir el estado; None para no hacerlo.
+
+        returns:
+            OnlineMonitor: el mismo monitor, para consultar su estado.
+        """
+        next_report = time.monotonic() + report_seconds if report_seconds else None
+        try:
+            for line in lines:
+                self.process_line(line)
+                if next_report is not None and time.monotonic() >= next_report:
+                    print_monitor_status(self)
+                    next_report = time.monotonic() + report_seconds
+        except KeyboardInterrupt:
+            print("\nmonitoreo detenido por el usuario.")
+        return self
+
+    def counters(self) -> dict:
+        """
+        lecturas validas por sesion, con el mismo formato que los contadores de assign_session_time.
+        """
+        return {profile_id: state.n for profile_id, state in self.profiles.items()}
+
+    def correlations(self, profile_id) -> pd.Series:
+        """
+        correlacion exponencial reciente de cada sensor con pm en una sesion.
+        """
+        state = self.profiles.get(profile_id)
+        if state is None or state.n < 2:
+            return pd.Series(np.nan, index=self.sensor_columns, name='correlacion_pm')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = state.ew_cov / np.sqrt(state.ew_var * state.ew_var[self._target])
+        return pd.Series(np.clip(values, -1.0, 1.0), index=self.sensor_columns, name='correlacion_pm')
+
+    def snapshot(self) -> pd.DataFrame:
+        """
+        estado actual de todas las sesiones con los nombres de columna de summarize_profiles.
+
+        returns:
+            pd.DataFrame: una fila por profile_id con filas, duracion, min/max/promedio/desviacion
+                de cada sensor, ultimo valor de pm y correlacion reciente de cada sensor con pm.
+        """
+        rows = {}
+        for profile_id, state in self.profiles.items():
+            row = {'filas': state.n, 'duracion_segundos': (state.n - 1) * SAMPLE_SECONDS}
+            std = np.sqrt(state.m2 / (state.n - 1)) if state.n > 1 else np.full(len(self.sensor_columns), np.nan)
+            correlations = self.correlations(profile_id)
+            for i, col in enumerate(self.sensor_columns):
+                row[f'{col}_min'] = state.low[i]
+                row[f'{col}_max'] = state.high[i]
+                row[f'{col}_promedio'] = state.mean[i]
+                row[f'{col}_desviacion'] = std[i]
+            row['pm_actual'] = state.last[self._target]
+            for col in self.sensor_columns:
+                if col != CORRELATION_TARGET:
+                    row[f'correlacion_pm_{col}'] = correlations[col]
+            row['alertas_activas'] = ','.join(sorted(state.active_alerts))
+            rows[profile_id] = row
+        snapshot = pd.DataFrame.from_dict(rows, orient='index')
+        snapshot.index.name = 'profile_id'
+        return snapshot
+
+
+def print_alert(alert: dict):
+    """
+    mostrar una alerta en la terminal.
+    """
+    if alert['tipo'] == 'alerta':
+        print(f"alerta: sesion {alert['profile_id']} {alert['columna']}={alert['valor']:.2f}°c supera "
+              f"{alert['umbral']:.2f}°c en {alert['Tiempo_Segundos']:.1f} s.")
+    else:
+        print(f"normalizado: sesion {alert['profile_id']} {alert['columna']}={alert['valor']:.2f}°c "
+              f"en {alert['Tiempo_Segundos']:.1f} s.")
+
+
+def print_monitor_status(monitor: OnlineMonitor):
+    """
+    mostrar un resumen breve del estado del monitor.
+    """
+    print(f"\n--- monitoreo: {monitor.readings} lecturas, {monitor.dropped} descartadas, "
+          f"{len(monitor.profiles)} sesiones, {monitor.alert_count} alertas ---")
+    for profile_id, state in monitor.profiles.items():
+        if state.last is None:
+            continue
+        pm = state.last[monitor._target]
+        winding = state.last[monitor.sensor_columns.index('stator_winding')]
+        active = ', '.join(sorted(state.active_alerts)) or 'sin alertas'
+        print(f"  sesion {profile_id}: {(state.n - 1) * SAMPLE_SECONDS:.1f} s, pm={pm:.2f}°c, "
+              f"stator_winding={winding:.2f}°c ({active})")
+
+
+# --- fuentes de lineas ---
+def tail_csv(file_path: str, from_start: bool = True, poll_seconds: float = DEFAULT_POLL_SECONDS,
+             idle_timeout: float = None):
+    """
+    seguir un csv al que se agregan lineas, como `tail -f`.
+
+    siempre entrega el encabezado primero; una linea incompleta al final del archivo se
+    espera hasta que termine de escribirse. si el archivo se trunca o se reemplaza se vuelve
+    a leer desde el principio.
+
+    args:
+        file_path (str): csv a seguir.
+        from_start (bool): entregar tambien las lineas que ya existen.
+        poll_seconds (float): espera entre intentos cuando no hay lineas nuevas.
+        idle_timeout (float): terminar tras estos segundos sin lineas nuevas; None para nunca.
+
+    yields:
+        str: lineas completas del csv.
+    """
+    handle = open(file_path, 'r', encoding='utf-8', newline='')
+    inode = os.fstat(handle.fileno()).st_ino
+    yield handle.readline() # encabezado
+    if not from_start:
+        handle.seek(0, os.SEEK_END)
+    pending = ''
+    idle_since = time.monotonic()
+    try:
+        while True:
+            line = handle.readline()
+            if line:
+                pending += line
+                if pending.endswith('\n'):
+                    yield pending
+                    pending = ''
+                    idle_since = time.monotonic()
+                continue
+            if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                return
+            time.sleep(poll_seconds)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError: # rotacion en curso
+                continue
+            if stat.st_ino != inode or stat.st_size < handle.tell(): # archivo reemplazado o truncado
+                handle.close()
+                handle = open(file_path, 'r', encoding='utf-8', newline='')
+                inode = os.fstat(handle.fileno()).st_ino
+                pending = ''
+    finally:
+        handle.close()
+
+
+def iter_stream_lines(stream=None):
+    """
+    leer lineas de una tuberia o de cualquier archivo abierto (por defecto la entrada estandar).
+    """
+    stream = sys.stdin if stream is None else stream
+    for line in stream:
+        yield line
+
+
+def iter_socket_lines(port: int, host: str = '127.0.0.1'):
+    """
+    escuchar en un socket local y entregar las lineas de cada conexion, una conexion a la vez.
+
+    el emisor puede enviar el encabezado csv al conectarse; si no, se usa el orden de columnas
+    vigente en el monitor.
+
+    yields:
+        str: lineas recibidas.
+    """
+    with socket.create_server((host, port)) as server:
+        print(f"escuchar lecturas en {host}:{port}.")
+        while True:
+            connection, address = server.accept()
+            with connection, connection.makefile('r', encoding='utf-8', newline='') as stream:
+                for line in stream:
+                    yield line
+
+
+def replay_csv(file_path: str, speed: float = 100.0, limit: int = None):
+    """
+    reproducir un csv existente como si llegara en vivo, acelerado `speed` veces.
+
+    las lineas se espacian 0.5 s / speed entre si (speed=None o 0 para no esperar), lo que
+    permite probar el monitor con el dataset historico.
+
+    args:
+        file_path (str): csv a reproducir.
+        speed (float): factor de aceleracion respecto a 2 hz.
+        limit (int): numero maximo de lecturas; None para todas.
+
+    yields:
+        str: encabezado y lineas del csv.
+    """
+    interval = SAMPLE_SECONDS / speed if speed else 0.0
+    with open(file_path, 'r', encoding='utf-8', newline='') as handle:
+        yield handle.readline() # encabezado
+        next_time = time.monotonic()
+        for count, line in enumerate(handle):
+            if limit is not None and count >= limit:
+                return
+            if interval:
+                next_time += interval
+                delay = next_time - time.monotonic()
+                if delay > 0: # sin acumular retraso si el procesamiento es mas lento
+                    time.sleep(delay)
+            yield line
+
+
+def _parse_thresholds(items: list) -> dict:
+    """
+    convertir argumentos 'columna=valor' en un dict de umbrales.
+    """
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for item in items or []:
+        col, _, value = item.partition('=')
+        thresholds[col] = float(value)
+    return thresholds
+
+
+# --- ejecucion desde linea de comandos ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='monitoreo en linea de lecturas del motor a 2 hz.')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--tail', metavar='CSV', help='seguir un csv al que se agregan lecturas')
+    source.add_argument('--replay', metavar='CSV', help='reproducir un csv existente acelerado')
+    source.add_argument('--socket', metavar='PUERTO', type=int, help='escuchar lecturas en un socket local')
+    source.add_argument('--pipe', action='store_true', help='leer lecturas de la entrada estandar')
+    parser.add_argument('--speed', type=float, default=100.0, help='aceleracion de --replay (0 sin esperas)')
+    parser.add_argument('--threshold', action='append', metavar='COL=VALOR', help='umbral de alerta, ej. pm=95')
+    parser.add_argument('--report-seconds', type=float, default=10.0, help='intervalo del resumen en terminal')
+    args = parser.parse_args()
+
+    if args.tail:
+        lines = tail_csv(args.tail)
+    elif args.replay:
+        lines = replay_csv(args.replay, speed=args.speed)
+    elif args.socket is not None:
+        lines = iter_socket_lines(args.socket)
+    else:
+        lines = iter_stream_lines()
+
+    monitor = OnlineMonitor(thresholds=_parse_thresholds(args.threshold))
+    monitor.run(lines, report_seconds=args.report_seconds)
+    print_monitor_status(monitor)
@@ -0,0 +1,355 @@
+import hashlib
+import inspect
+import io
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from data_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_CACHE_BYTES, source_fingerprint
+from instrumentation import track_stage, is_tracking_memory, _count_rows
+
+DEFAULT_STAGE_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, 'etapas') # resultados memorizados de cada etapa
+
+
+class Stage:
+    """
+    etapa del pipeline: una funcion, sus etapas de entrada y sus parametros.
+    """
+
+    def __init__(self, name: str, func, inputs=(), params: dict = None, sources: list = (),
+                 memoize: bool = True, main_thread: bool = False):
+        self.name = name
+        self.func = func
+        # inputs como lista pasa los resultados por posicion; como dict, por nombre de argumento
+        self.input_args = dict(inputs) if isinstance(inputs, dict) else dict(enumerate(inputs))
+        self.inputs = list(self.input_args.values()) # etapas de las que depende
+        self.params = dict(params or {})
+        self.sources = list(sources) # archivos cuyo contenido invalida la etapa
+        self.memoize = memoize # guardar resultado en disco
+        self.main_thread = main_thread # ejecutar en el hilo principal (por ejemplo ventanas de graficos)
+
+
+class _ThreadOutput(io.TextIOBase):
+    """
+    redirigir print de cada hilo a su propio buffer para no mezclar salidas de etapas concurrentes.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _local_modules(module, root: str, found: dict) -> dict:
+    """
+    modulos del proyecto (archivos dentro de root) usados por un modulo, de forma transitiva.
+    """
+    path = getattr(module, '__file__', None)
+    if path is None or module.__name__ in found or os.path.dirname(os.path.abspath(path)) != root:
+        return found
+    found[module.__name__] = module
+    for value in list(vars(module).values()): # modulos importados y funciones o clases importadas
+        dependency = value if inspect.ismodule(value) else sys.modules.get(getattr(value, '__module__', None) or '')
+        if dependency is not None:
+            _local_modules(dependency, root, found)
+    return found
+
+
+def _code_fingerprint(func, memo: dict = None) -> str:
+    """
+    huella del codigo de la funcion, de su modulo y de los modulos del proyecto que usa, para
+    invalidar resultados si cambia la implementacion de la etapa o de algo que llama.
+
+    args:
+        func (callable): funcion de la etapa.
+        memo (dict): huellas de modulos ya calculadas (nombre -> hash).
+    """
+    memo = {} if memo is None else memo
+    module = inspect.getmodule(func)
+    module_path = getattr(module, '__file__', None)
+    if module_path is None:
+        return hashlib.sha256(getattr(func, '__qualname__', repr(func)).encode()).hexdigest()
+    digest = hashlib.sha256()
+    digest.update(getattr(func, '__qualname__', repr(func)).encode())
+    root = os.path.dirname(os.path.abspath(module_path))
+    for name, dependency in sorted(_local_modules(module, root, {}).items()):
+        if name not in memo:
+            try:
+                memo[name] = hashlib.sha256(inspect.getsource(dependency).encode()).hexdigest()
+            except (OSError, TypeError):
+                memo[name] = name
+        digest.update(f'{name}:{memo[name]}'.encode())
+    return digest.hexdigest()
+
+
+class PipelineRunner:
+    """
+    ejecutar un grafo de etapas memorizando cada resultado en disco.
+
+    la clave de cada etapa combina su codigo (con el de los modulos del proyecto que usa), sus
+    parametros, la huella de sus archivos fuente y las claves de sus entradas, por lo que una
+    etapa solo se ejecuta cuando algo de lo que depende cambio. las etapas independientes se ejecutan en paralelo en un pool de hilos,
+    salvo cuando la instrumentacion mide memoria: tracemalloc tiene un solo pico por proceso, asi
+    que entonces todas las etapas corren una tras otra en el hilo principal y cada una reporta el suyo.
+    al guardar una clave nueva se borran las anteriores de la misma etapa, y al terminar cada
+    ejecucion se expulsan los resultados usados hace mas tiempo si la carpeta supera el limite.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_STAGE_CACHE_DIR, workers: int = 4,
+                 max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.max_cache_bytes = max_cache_bytes # tamaño maximo de los resultados memorizados
+        self.stages = {} # nombre -> Stage, en orden de registro
+
+    def add_stage(self, name: str, func, inputs=(), **options) -> Stage:
+        """
+        registrar etapa; sus entradas deben estar registradas antes.
+
+        args:
+            name (str): nombre unico de la etapa.
+            func (callable): funcion de la etapa.
+            inputs (list | dict): etapas cuyos resultados recibe, por posicion (lista) o
+                por nombre de argumento (dict argumento -> etapa).
+            **options: params, sources, memoize y main_thread de Stage.
+
+        returns:
+            Stage: la etapa registrada.
+        """
+        dependencies = inputs.values() if isinstance(inputs, dict) else inputs
+        missing = [dep for dep in dependencies if dep not in self.stages]
+        if missing:
+            raise ValueError(f"la etapa '{name}' depende de etapas no registradas: {missing}")
+        self.stages[name] = Stage(name, func, inputs, **options)
+        return self.stages[name]
+
+    def stage_keys(self) -> dict:
+        """
+        calcular la clave de cada etapa a partir de sus entradas (sin ejecutar nada).
+
+        returns:
+            dict: nombre de etapa -> clave hexadecimal.
+        """
+        keys = {}
+        fingerprints = {}
+        module_hashes = {} # cada modulo se lee una vez por calculo de claves
+        for name, stage in self.stages.items(): # el orden de registro ya es topologico
+            for path in stage.sources:
+                if path not in fingerprints:
+                    fingerprints[path] = source_fingerprint(path, DEFAULT_CACHE_DIR)['key']
+            material = {
+                'name': name,
+                'code': _code_fingerprint(stage.func, module_hashes),
+                'params': stage.params,
+                'input_args': sorted(map(str, stage.input_args)),
+                'sources': [fingerprints[path] for path in stage.sources],
+                'inputs': [keys[dep] for dep in stage.inputs],
+            }
+            payload = json.dumps(material, sort_keys=True, default=repr).encode()
+            keys[name] = hashlib.sha256(payload).hexdigest()[:24]
+        return keys
+
+    def _cache_path(self, name: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{name}-{key}.pkl')
+
+    def _cached_files(self) -> list:
+        """
+        resultados memorizados en disco como (etapa, ruta), sin temporales a medio escribir.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [(filename.rsplit('-', 1)[0], os.path.join(self.cache_dir, filename))
+                for filename in os.listdir(self.cache_dir) if filename.endswith('.pkl')]
+
+    def _prune_stage(self, name: str, keep_path: str) -> int:
+        """
+        borrar resultados de claves anteriores de una etapa (solo esa etapa los escribe).
+        """
+        removed = 0
+        for stage_name, path in self._cached_files():
+            if stage_name == name and path != keep_path:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError: # otro proceso ya lo borro
+                    pass
+        return removed
+
+    def evict(self, protect: list = (), max_cache_bytes: int = None) -> int:
+        """
+        expulsar resultados usados hace mas tiempo hasta que la carpeta quepa en el limite.
+
+        args:
+            protect (list): rutas que no se deben expulsar (por ejemplo, las de la ejecucion actual).
+            max_cache_bytes (int): tamaño maximo; None para usar el del runner.
+
+        returns:
+            int: archivos expulsados.
+        """
+        limit = self.max_cache_bytes if max_cache_bytes is None else max_cache_bytes
+        files = []
+        for _, path in self._cached_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        evicted = 0
+        for _, size, path in sorted(files): # menos reciente primero
+            if total <= limit:
+                break
+            if path in protect:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        return evicted
+
+    def _needed_stages(self, targets: list, keys: dict) -> list:
+        """
+        etapas que hay que ejecutar o leer de cache para obtener los objetivos.
+        """
+        needed = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            stage = self.stages[name]
+            if stage.memoize and os.path.exists(self._cache_path(name, keys[name])):
+                continue # resultado en disco: no hace falta resolver sus entradas
+            pending.extend(stage.inputs)
+        return [name for name in self.stages if name in needed]
+
+    def _run_stage(self, stage: Stage, key: str, results: dict, output: _ThreadOutput):
+        """
+        ejecutar o recuperar una etapa capturando su salida de texto.
+        """
+        start = time.perf_counter()
+        path = self._cache_path(stage.name, key)
+        if stage.memoize and os.path.exists(path):
+            with open(path, 'rb') as handle:
+                value, text = pickle.load(handle)
+            try:
+                os.utime(path) # registrar uso para la politica de expulsion
+            except OSError:
+                pass
+            return value, text, True, time.perf_counter() - start
+
+        args = [results[dep] for arg, dep in stage.input_args.items() if isinstance(arg, int)]
+        kwargs = {arg: results[dep] for arg, dep in stage.input_args.items() if not isinstance(arg, int)}
+        kwargs.update(stage.params)
+        buffer = io.StringIO()
+        output.local.buffer = buffer
+        try:
+            with track_stage(f'pipeline.{stage.name}') as measured: # sin costo si la instrumentacion esta apagada
+                value = stage.func(*args, **kwargs)
+                first = args[0] if args else next(iter(kwargs.values()), None)
+                measured.set_rows(_count_rows(first)) # filas de la entrada o, si no es una tabla, del resultado
+                measured.set_rows(_count_rows(value))
+        finally:
+            output.local.buffer = None
+        text = buffer.getvalue()
+        if stage.memoize:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = path + f'.tmp-{threading.get_ident()}'
+            with open(tmp_path, 'wb') as handle:
+                pickle.dump((value, text), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path) # publicar resultado completo
+            self._prune_stage(stage.name, path) # guardar solo el resultado vigente de cada etapa
+        return value, text, False, time.perf_counter() - start
+
+    def run(self, targets: list = None) -> dict:
+        """
+        ejecutar las etapas invalidas necesarias para los objetivos.
+
+        args:
+            targets (list): etapas a obtener; None para todas.
+
+        returns:
+            dict: nombre de etapa -> resultado, para las etapas resueltas.
+        """
+        targets = list(self.stages) if targets is None else targets
+        keys = self.stage_keys()
+        needed = self._needed_stages(targets, keys)
+        results = {}
+        remaining = list(needed)
+        running = {}
+        output = _ThreadOutput(sys.stdout)
+        previous_stdout, sys.stdout = sys.stdout, output
+
+        def report(name, value, text, cached, elapsed):
+            results[name] = value
+            status = 'recuperar de cache' if cached else f'ejecutar en {elapsed:.2f} s'
+            output.stream.write(text) # mostrar salida completa de la etapa de una vez
+            output.stream.write(f"[pipeline] etapa '{name}': {status}.\n")
+
+        try:
+            if is_tracking_memory(): # en serie y en orden topologico: un pico de memoria por etapa
+                for name in needed:
+                    report(name, *self._run_stage(self.stages[name], keys[name], results, output))
+                remaining = []
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                while remaining or running:
+                    ready = [name for name in remaining
+                             if all(dep in results for dep in self._inputs_to_resolve(name, keys))]
+                    # enviar primero las etapas del pool para que avancen mientras corre el hilo principal
+                    for name in sorted(ready, key=lambda n: self.stages[n].main_thread):
+                        remaining.remove(name)
+                        stage = self.stages[name]
+                        if stage.main_thread:
+                            report(name, *self._run_stage(stage, keys[name], results, output))
+                        else:
+                            running[pool.submit(self._run_stage, stage, keys[name], dict(results), output)] = name
+                    if not running:
+                        if remaining and not ready:
+                            raise RuntimeError(f"etapas sin poder resolver: {remaining}")
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        report(running.pop(future), *future.result())
+        finally:
+            sys.stdout = previous_stdout
+        self.evict(protect=[self._cache_path(name, key) for name, key in keys.items()])
+        return results
+
+    def _inputs_to_resolve(self, name: str, keys: dict) -> list:
+        """
+        entradas que deben estar listas antes de la etapa (ninguna si su resultado esta en cache).
+        """
+        stage = self.stages[name]
+        if stage.memoize and os.path.exists(self._cache_path(name, keys[name])):
+            return []
+        return stage.inputs
+
+    def invalidate(self, names: list = None) -> int:
+        """
+        borrar resultados memorizados de algunas etapas, o de todas.
+
+        returns:
+            int: archivos eliminados.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        removed = 0
+        for filename in os.listdir(self.cache_dir):
+            stage_name = filename.rsplit('-', 1)[0]
+            if names is None or stage_name in names:
+                os.remove(os.path.join(self.cache_dir, filename))
+                removed += 1
+        return removed
@@ -0,0 +1,137 @@
+import pandas as pd
+import numpy as np
+
+DEFAULT_BATCH_ROWS = 1_000_000 # filas por lote al recorrer un dataframe grande
+
+
+class ProfileStore:
+    """
+    indice de sesiones (profile_id) sobre un dataframe limpio.
+
+    las filas de cada sesion quedan contiguas y se guardan sus posiciones de inicio y fin,
+    de modo que obtener una sesion es un corte por posicion (vista, sin copia) en lugar de
+    un filtro booleano sobre todo el dataframe.
+    """
+
+    def __init__(self, df: pd.DataFrame, profile_ids: np.ndarray, starts: np.ndarray, stops: np.ndarray):
+        self.data = df # dataframe con sesiones contiguas
+        self.profile_ids = profile_ids # ids en el orden en que aparecen en data
+        self.starts = starts # posicion de la primera fila de cada sesion
+        self.stops = stops # posicion siguiente a la ultima fila de cada sesion
+        self._positions = {pid: i for i, pid in enumerate(profile_ids.tolist())} # buscar sesion por id
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, sort: bool = True) -> 'ProfileStore':
+        """
+        construir indice de sesiones a partir de un dataframe limpio.
+
+        args:
+            df (pd.DataFrame): dataframe limpio con columna 'profile_id'.
+            sort (bool): ordenar sesiones por profile_id; si es False se mantiene el
+                orden de primera aparicion.
+
+        returns:
+            ProfileStore: indice listo para consultar sesiones.
+        """
+        codes, profile_ids = pd.factorize(df['profile_id'], sort=sort)
+        profile_ids = np.asarray(profile_ids)
+        if len(codes) and np.any(np.diff(codes) < 0):
+            # reordenar filas una sola vez; el orden estable conserva el tiempo dentro de cada sesion
+            order = np.argsort(codes, kind='stable')
+            df = df.take(order)
+            codes = codes[order]
+        counts = np.bincount(codes, minlength=len(profile_ids))
+        stops = np.cumsum(counts)
+        return cls(df, profile_ids, stops - counts, stops)
+
+    def __len__(self) -> int:
+        return len(self.profile_ids)
+
+    def __contains__(self, profile_id) -> bool:
+        return profile_id in self._positions
+
+    def __iter__(self):
+        """
+        recorrer sesiones como pares (profile_id, vista del dataframe).
+        """
+        for i, profile_id in enumerate(self.profile_ids.tolist()):
+            yield profile_id, self.data.iloc[self.starts[i]:self.stops[i]]
+
+    def get(self, profile_id) -> pd.DataFrame:
+        """
+        devolver vista de las filas de una sesion, vacia si no existe.
+
+        args:
+            profile_id: id de la sesion (acepta 11 u 11.0).
+
+        returns:
+            pd.DataFrame: vista de las filas de la sesion.
+        """
+        i = self._positions.get(profile_id)
+        if i is None:
+            return self.data.iloc[0:0]
+        return self.data.iloc[self.starts[i]:self.stops[i]]
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """
+        numero de filas de cada sesion, en el orden de profile_ids.
+        """
+        return self.stops - self.starts
+
+
+def as_profile_store(data) -> ProfileStore:
+    """
+    devolver un ProfileStore, construyendolo si se recibe un dataframe.
+    """
+    return data if isinstance(data, ProfileStore) else ProfileStore.from_dataframe(data)
+
+
+def as_dataframe(data) -> pd.DataFrame:
+    """
+    devolver el dataframe subyacente de un ProfileStore o el mismo dataframe.
+    """
+    return data.data if isinstance(data, ProfileStore) else data
+
+
+def iter_batches(df: pd.DataFrame, batch_rows: int = DEFAULT_BATCH_ROWS):
+    """
+    recorrer un dataframe en cortes por posicion de a lo sumo batch_rows filas (vistas, sin copia).
+    """
+    for start in range(0, len(df), batch_rows):
+        yield df.iloc[start:start + batch_rows]
+
+
+def fold_accumulators(chunks, new_accumulator, by_profile: bool = False):
+    """
+    acumular bloques con un acumulador combinable (metodos update y merge), global y por sesion.
+
+    con by_profile cada sesion de cada bloque se acumula en un parcial que se combina en el
+    acumulador de su sesion y en el global, asi que las sesiones que cruzan bloques quedan
+    completas y el global no vuelve a recorrer los datos.
+
+    args:
+        chunks (iterable): bloques de datos: dataframes, o con by_profile tambien ProfileStore.
+        new_accumulator (callable): crea un acumulador vacio, sin argumentos.
+        by_profile (bool): acumular tambien un resultado por sesion.
+
+    returns:
+        tuple: (acumulador global, dict de acumuladores por profile_id o None).
+    """
+    total = new_accumulator()
+    if not by_profile:
+        for chunk in chunks:
+            total.update(chunk)
+        return total, None
+
+    per_profile = {}
+    for chunk in chunks:
+        store = chunk if isinstance(chunk, ProfileStore) else ProfileStore.from_dataframe(chunk, sort=False)
+        for profile_id, df_profile in store:
+            partial = new_accumulator().update(df_profile)
+            if profile_id in per_profile:
+                per_profile[profile_id].merge(partial)
+            else:
+                per_profile[profile_id] = partial
+            total.merge(partial)
+    return total, per_profile
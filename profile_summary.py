@@ -0,0 +1,116 @@
+import pandas as pd
+import numpy as np
+
+from data_loader import SENSOR_COLUMNS
+from profile_store import as_profile_store
+from instrumentation import instrumented
+
+# umbrales de cambio neto de pm usados para clasificar la tendencia de cada sesion
+PM_INCREASE_RATIO = 1.05
+PM_DECREASE_RATIO = 0.95
+
+
+def summary_columns(columns: list) -> list:
+    """
+    columnas de la tabla de resumen para las columnas de sensores dadas, en orden.
+    """
+    names = ['filas', 'duracion_segundos']
+    for col in columns:
+        names += [f'{col}_min', f'{col}_max', f'{col}_promedio']
+    if 'torque' in columns:
+        names.append('torque_abs_max')
+    if 'pm' in columns:
+        names += ['pm_inicial', 'pm_final', 'tiempo_pm_max', 'cambio_neto_pm', 'tendencia_pm']
+    return names
+
+
+def _empty_summary(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """
+    tabla de resumen sin filas con las mismas columnas y tipos que summarize_profiles.
+    """
+    dtypes = {'filas': np.int64, 'duracion_segundos': df['Tiempo_Segundos'].dtype}
+    for col in columns:
+        dtypes[f'{col}_min'] = dtypes[f'{col}_max'] = df[col].dtype # reduceat conserva el tipo del sensor
+        dtypes[f'{col}_promedio'] = np.float64
+    if 'torque' in columns:
+        dtypes['torque_abs_max'] = df['torque'].dtype
+    if 'pm' in columns:
+        dtypes.update({'pm_inicial': df['pm'].dtype, 'pm_final': df['pm'].dtype,
+                       'tiempo_pm_max': df['Tiempo_Segundos'].dtype, 'cambio_neto_pm': df['pm'].dtype})
+    empty = {name: pd.Series(dtype=dtypes.get(name, object)) for name in summary_columns(columns)}
+    if 'pm' in columns:
+        empty['tendencia_pm'] = pd.Series(np.array([], dtype=str)) # mismo tipo que np.select con etiquetas
+    return pd.DataFrame(empty, index=pd.Index([], name='profile_id'))
+
+
+@instrumented('resumen_sesiones')
+def summarize_profiles(data, columns: list = None) -> pd.DataFrame:
+    """
+    calcular en una pasada vectorizada el resumen de todas las sesiones.
+
+    las filas de cada sesion son contiguas en el ProfileStore, asi que cada metrica se
+    obtiene con un solo reduceat de numpy sobre la columna completa en lugar de filtrar
+    sesion por sesion.
+
+    args:
+        data (pd.DataFrame | ProfileStore): datos limpios con columna 'Tiempo_Segundos'.
+        columns (list): columnas de sensores a resumir; None para todas.
+
+    returns:
+        pd.DataFrame: una fila por profile_id con min/max/promedio de cada sensor,
+            duracion, pm inicial/final/maximo, tiempo del maximo y tendencia de pm.
+    """
+    store = as_profile_store(data)
+    df = store.data
+    columns = [col for col in (SENSOR_COLUMNS if columns is None else columns) if col in df.columns]
+    starts, stops, sizes = store.starts, store.stops, store.sizes
+    summary = {'filas': sizes}
+
+    if len(store) == 0: # mismo esquema que con datos, para que quien indexa columnas no falle
+        return _empty_summary(df, columns)
+
+    time = df['Tiempo_Segundos'].to_numpy()
+    summary['duracion_segundos'] = np.maximum.reduceat(time, starts) # ultimo instante de cada sesion
+
+    for col in columns: # un reduceat por metrica sobre la columna contigua
+        values = df[col].to_numpy()
+        summary[f'{col}_min'] = np.minimum.reduceat(values, starts)
+        summary[f'{col}_max'] = np.maximum.reduceat(values, starts)
+        summary[f'{col}_promedio'] = np.add.reduceat(values, starts, dtype=np.float64) / sizes
+
+    if 'torque' in columns:
+        summary['torque_abs_max'] = np.maximum(np.abs(summary['torque_min']), np.abs(summary['torque_max']))
+
+    if 'pm' in columns:
+        pm = df['pm'].to_numpy()
+        initial_pm = pm[starts]
+        final_pm = pm[stops - 1]
+        # primera posicion donde pm alcanza el maximo de su sesion (equivalente a idxmax)
+        is_max = pm == np.repeat(summary['pm_max'], sizes)
+        first_max = np.minimum.reduceat(np.where(is_max, np.arange(len(pm)), len(pm)), starts)
+        summary['pm_inicial'] = initial_pm
+        summary['pm_final'] = final_pm
+        summary['tiempo_pm_max'] = time[first_max]
+        summary['cambio_neto_pm'] = final_pm - initial_pm
+        summary['tendencia_pm'] = np.select(
+            [final_pm > initial_pm * PM_INCREASE_RATIO, final_pm < initial_pm * PM_DECREASE_RATIO],
+            ['aumento', 'disminucion'],
+            default='estable',
+        )
+
+    return pd.DataFrame(summary, index=pd.Index(store.profile_ids, name='profile_id'))
+
+
+def get_profile_summary(summary: pd.DataFrame, profile_id):
+    """
+    devolver la fila de resumen de una sesion, o None si no existe.
+
+    args:
+        summary (pd.DataFrame): tabla de summarize_profiles.
+        profile_id: id de la sesion (acepta 11 u 11.0).
+
+    returns:
+        pd.Series: metricas de la sesion.
+    """
+    matches = np.flatnonzero(summary.index.to_numpy() == profile_id)
+    return summary.iloc[matches[0]] if len(matches) else None
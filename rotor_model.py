@@ -0,0 +1,259 @@
+import numpy as np
+import pandas as pd
+
+from correlation_engine import CorrelationAccumulator
+from data_cache import DEFAULT_CACHE_DIR
+from feature_engine import FEATURE_COLUMNS, load_features_cached
+from profile_store import DEFAULT_BATCH_ROWS, ProfileStore, fold_accumulators
+from instrumentation import instrumented
+
+# --- configuracion del modelo de temperatura del rotor ---
+TARGET_COLUMN = 'pm' # temperatura del rotor
+DEFAULT_ALPHAS = (0.0001, 0.001, 0.01, 0.1, 1.0) # penalizaciones ridge a comparar (variables estandarizadas)
+
+
+def accumulate_profiles(features, target: np.ndarray, store: ProfileStore, names: list,
+                        batch_rows: int = DEFAULT_BATCH_ROWS) -> dict:
+    """
+    acumular ecuaciones normales (medias y co-momentos de [X, y]) por sesion.
+
+    la matriz puede estar mapeada en memoria: solo se pasa a float64 un lote a la vez.
+
+    args:
+        features (np.ndarray | list): matriz filas x caracteristicas con sesiones contiguas, o
+            lista de matrices o columnas con las mismas filas que se unen en cada lote.
+        target (np.ndarray): temperatura del rotor de cada fila.
+        store (ProfileStore): indice de sesiones de las filas.
+        names (list): nombres de las columnas de la matriz.
+        batch_rows (int): filas por lote.
+
+    returns:
+        dict: profile_id -> CorrelationAccumulator con columnas names + [TARGET_COLUMN].
+    """
+    columns = list(names) + [TARGET_COLUMN]
+    blocks = features if isinstance(features, list) else [features]
+    per_profile = {}
+    for profile_id, start, stop in zip(store.profile_ids.tolist(), store.starts, store.stops):
+        accumulator = CorrelationAccumulator(columns)
+        for begin in range(start, stop, batch_rows):
+            end = min(begin + batch_rows, stop)
+            accumulator.update(np.column_stack([block[begin:end] for block in blocks] + [target[begin:end]]))
+        per_profile[profile_id] = accumulator
+    return per_profile
+
+
+def accumulate_chunks(chunks, columns: list = None) -> dict:
+    """
+    acumular ecuaciones normales por sesion desde bloques limpios (por ejemplo
+    clean_and_prepare_chunks), sin tener el dataset completo en memoria.
+
+    args:
+        chunks (iterable): bloques con las columnas de entrada, 'profile_id' y pm.
+        columns (list): columnas de entrada; None para FEATURE_COLUMNS.
+
+    returns:
+        dict: profile_id -> CorrelationAccumulator; los de varios procesos se combinan con merge.
+    """
+    columns = list(FEATURE_COLUMNS if columns is None else columns) + [TARGET_COLUMN]
+    _, per_profile = fold_accumulators(chunks, lambda: CorrelationAccumulator(columns), by_profile=True)
+    return per_profile
+
+
+def merge_accumulators(accumulators) -> CorrelationAccumulator:
+    """
+    combinar acumuladores (de sesiones, bloques o procesos) en uno solo.
+    """
+    accumulators = list(accumulators)
+    total = CorrelationAccumulator(accumulators[0].columns)
+    for accumulator in accumulators:
+        total.merge(accumulator)
+    return total
+
+
+class RotorTemperatureModel:
+    """
+    regresion ridge lineal de pm sobre columnas de sensores y caracteristicas.
+
+    se ajusta solo con las medias y co-momentos acumulados, sin volver a los datos: las
+    variables se estandarizan con esos mismos estadisticos y el intercepto no se penaliza.
+    """
+
+    def __init__(self, feature_names: list, coef: np.ndarray, intercept: float, alpha: float):
+        self.feature_names = list(feature_names)
+        self.coef = coef # coeficientes en las unidades originales
+        self.intercept = intercept
+        self.alpha = alpha
+
+    @classmethod
+    def from_accumulator(cls, accumulator: CorrelationAccumulator, alpha: float = 0.01) -> 'RotorTemperatureModel':
+        """
+        resolver las ecuaciones normales ridge de un acumulador con columnas [X, pm].
+
+        args:
+            accumulator (CorrelationAccumulator): estadisticos de entrenamiento.
+            alpha (float): penalizacion sobre variables estandarizadas, por fila.
+
+        returns:
+            RotorTemperatureModel: modelo ajustado.
+        """
+        k = len(accumulator.columns) - 1
+        n = max(accumulator.n, 1)
+        sxx = accumulator.comoment[:k, :k] / n # covarianza de las entradas
+        sxy = accumulator.comoment[:k, k] / n
+        scale = np.sqrt(np.diag(sxx))
+        scale[scale == 0] = 1.0 # columnas constantes: coeficiente 0 por la penalizacion
+        system = sxx / np.outer(scale, scale) + alpha * np.eye(k)
+        coef = np.linalg.lstsq(system, sxy / scale, rcond=None)[0] / scale
+        intercept = accumulator.mean[k] - accumulator.mean[:k] @ coef
+        return cls(accumulator.columns[:k], coef, float(intercept), alpha)
+
+    def sse(self, accumulator: CorrelationAccumulator) -> float:
+        """
+        suma de errores al cuadrado sobre las filas de un acumulador, sin recorrer los datos.
+        """
+        k = len(self.coef)
+        bias = self.bias(accumulator) # error medio
+        comoment = accumulator.comoment
+        sse = comoment[k, k] - 2 * self.coef @ comoment[:k, k] + self.coef @ comoment[:k, :k] @ self.coef
+        return float(max(sse, 0.0) + accumulator.n * bias * bias)
+
+    def bias(self, accumulator: CorrelationAccumulator) -> float:
+        """
+        error medio (real - prediccion) sobre las filas de un acumulador.
+        """
+        k = len(self.coef)
+        return float(accumulator.mean[k] - self.intercept - accumulator.mean[:k] @ self.coef)
+
+    def predict(self, features: np.ndarray, batch_rows: int = DEFAULT_BATCH_ROWS) -> np.ndarray:
+        """
+        predecir pm por lotes con un producto matriz-vector en float32.
+
+        args:
+            features (np.ndarray | pd.DataFrame): matriz con las columnas de feature_names.
+            batch_rows (int): filas por lote (acota la memoria temporal con matrices mapeadas).
+
+        returns:
+            np.ndarray: prediccion float32 de cada fila.
+        """
+        if isinstance(features, pd.DataFrame):
+            features = features[self.feature_names].to_numpy(dtype=np.float32)
+        coef = self.coef.astype(np.float32)
+        predictions = np.empty(len(features), dtype=np.float32)
+        for start in range(0, len(features), batch_rows):
+            batch = np.asarray(features[start:start + batch_rows], dtype=np.float32)
+            np.dot(batch, coef, out=predictions[start:start + batch_rows])
+        predictions += np.float32(self.intercept)
+        return predictions
+
+    def coefficients(self) -> pd.Series:
+        """
+        coeficientes en unidades originales, ordenados por magnitud.
+        """
+        series = pd.Series(self.coef, index=self.feature_names, name='coeficiente')
+        return series.reindex(series.abs().sort_values(ascending=False).index)
+
+
+@instrumented('validacion_sesiones')
+def leave_one_profile_out(per_profile: dict, alphas: tuple = DEFAULT_ALPHAS):
+    """
+    validar dejando una sesion fuera para cada alpha, restando la sesion del total acumulado.
+
+    cada pliegue cuesta una resta de acumuladores y un sistema de k x k; los datos no se vuelven
+    a leer.
+
+    args:
+        per_profile (dict): profile_id -> acumulador de la sesion.
+        alphas (tuple): penalizaciones ridge a comparar.
+
+    returns:
+        tuple: (mejor alpha, dataframe de error por sesion con ese alpha, dict alpha -> rmse global).
+    """
+    total = merge_accumulators(per_profile.values())
+    scores = {}
+    reports = {}
+    for alpha in alphas:
+        rows = {}
+        total_sse = 0.0
+        for profile_id, held_out in per_profile.items():
+            model = RotorTemperatureModel.from_accumulator(total.subtract(held_out), alpha)
+            sse = model.sse(held_out)
+            total_sse += sse
+            variance = held_out.comoment[-1, -1]
+            rows[profile_id] = {
+                'filas': held_out.n,
+                'rmse': np.sqrt(sse / held_out.n),
+                'sesgo': model.bias(held_out),
+                'r2': 1 - sse / variance if variance > 0 else np.nan,
+            }
+        scores[alpha] = float(np.sqrt(total_sse / total.n))
+        reports[alpha] = pd.DataFrame.from_dict(rows, orient='index').rename_axis('profile_id')
+    best = min(scores, key=scores.get)
+    return best, reports[best], scores
+
+
+def profile_errors(target: np.ndarray, predictions: np.ndarray, store: ProfileStore) -> pd.DataFrame:
+    """
+    error de prediccion por sesion (mae, rmse, error maximo y sesgo) con reduceat.
+
+    args:
+        target (np.ndarray): pm real de cada fila.
+        predictions (np.ndarray): pm predicho de cada fila.
+        store (ProfileStore): indice de sesiones de las filas.
+
+    returns:
+        pd.DataFrame: una fila por profile_id.
+    """
+    error = target.astype(np.float64) - predictions
+    sizes = store.sizes
+    absolute = np.abs(error)
+    return pd.DataFrame({
+        'filas': sizes,
+        'mae': np.add.reduceat(absolute, store.starts) / sizes,
+        'rmse': np.sqrt(np.add.reduceat(error * error, store.starts) / sizes),
+        'error_maximo': np.maximum.reduceat(absolute, store.starts),
+        'sesgo': np.add.reduceat(error, store.starts) / sizes,
+    }, index=pd.Index(store.profile_ids, name='profile_id'))
+
+
+def train_rotor_model(file_path: str, alphas: tuple = DEFAULT_ALPHAS, include_raw: bool = True,
+                      cache_dir: str = DEFAULT_CACHE_DIR, **feature_options):
+    """
+    entrenar el modelo de pm con caracteristicas en cache y validacion dejando una sesion fuera.
+
+    el dataset limpio y la matriz de caracteristicas se abren mapeados en memoria y se
+    acumulan por lotes, por lo que no necesitan caber en ram.
+
+    args:
+        file_path (str): archivo csv de origen.
+        alphas (tuple): penalizaciones ridge a comparar.
+        include_raw (bool): agregar las columnas de sensores sin transformar.
+        cache_dir (str): carpeta raiz de la cache.
+        **feature_options: windows, spans o lags de load_features_cached.
+
+    returns:
+        tuple: (modelo ajustado con todas las sesiones, reporte de validacion por sesion), o None.
+    """
+    loaded = load_features_cached(file_path, cache_dir=cache_dir, **feature_options)
+    if loaded is None:
+        print("error: no poder cargar datos para entrenar el modelo.")
+        return None
+    features, names, store = loaded
+    target = store.data[TARGET_COLUMN].to_numpy()
+    if include_raw: # columnas de sensores sin transformar junto a las caracteristicas
+        raw_columns = [col for col in FEATURE_COLUMNS if col in store.data.columns]
+        # una columna por bloque: los arreglos mapeados de la cache se leen lote a lote, sin copiarlos
+        features = [store.data[col].to_numpy() for col in raw_columns] + [features]
+        names = raw_columns + list(names)
+
+    per_profile = accumulate_profiles(features, target, store, names)
+
+    alpha, report, scores = leave_one_profile_out(per_profile, alphas)
+    for candidate, rmse in scores.items():
+        print(f"  alpha={candidate:g}: rmse dejando una sesion fuera = {rmse:.3f} °c")
+    model = RotorTemperatureModel.from_accumulator(merge_accumulators(per_profile.values()), alpha)
+    print(f"modelo de pm ajustar con alpha={alpha:g} sobre {len(model.feature_names)} variables "
+          f"y {int(sum(acc.n for acc in per_profile.values()))} filas.")
+    print("sesiones con mayor error (dejando la sesion fuera):")
+    print(report.sort_values('rmse', ascending=False).head(5).round(3).to_string())
+    return model, report
+
@@ -0,0 +1,172 @@
+import pandas as pd
+import numpy as np
+
+from data_loader import SENSOR_COLUMNS, MOTOR_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow es opcional, escribir con pandas si no esta instalado
+    pa = None
+    pa_csv = None
+
+# --- parametros del generador (aproximan el dataset de kaggle: ~1.3m filas, 69 sesiones) ---
+MEAN_PROFILE_ROWS = 19_000 # filas promedio por sesion (~2.6 horas a 2 hz)
+MIN_PROFILE_ROWS = 2_000
+MAX_PROFILE_ROWS = 45_000
+DEFAULT_NULL_FRACTION = 1e-6 # fraccion de filas con algun valor nulo
+DEFAULT_CHUNK_ROWS = 1_000_000 # filas por bloque al escribir archivos grandes
+
+
+def _profile_lengths(rng, n_rows: int) -> np.ndarray:
+    """
+    sortear longitudes de sesion (lognormal recortada) que suman exactamente n_rows.
+    """
+    lengths = []
+    remaining = n_rows
+    while remaining > 0:
+        length = int(np.clip(rng.lognormal(np.log(MEAN_PROFILE_ROWS), 0.6), MIN_PROFILE_ROWS, MAX_PROFILE_ROWS))
+        lengths.append(min(length, remaining))
+        remaining -= lengths[-1]
+    return np.array(lengths, dtype=np.int64)
+
+
+def _moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    promedio movil causal con suma acumulada (respuesta termica lenta).
+    """
+    cumulative = np.cumsum(values, dtype=np.float64)
+    shifted = np.concatenate([np.zeros(window), cumulative[:-window]]) if len(values) > window else np.zeros(len(values))
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    return (cumulative - shifted) / counts
+
+
+def _generate_profile(rng, n: int) -> dict:
+    """
+    generar una sesion: puntos de operacion por tramos y temperaturas que siguen la carga.
+    """
+    # puntos de operacion constantes por tramos de 1 a 10 minutos
+    segment_ids = np.cumsum(rng.random(n) < 1 / rng.integers(120, 1200))
+    n_segments = segment_ids[-1] + 1
+    speed_levels = rng.uniform(0, 6000, n_segments)
+    torque_levels = rng.uniform(-50, 220, n_segments)
+    motor_speed = speed_levels[segment_ids] + rng.normal(0, 15, n)
+    torque = torque_levels[segment_ids] + rng.normal(0, 2, n)
+    i_q = torque * 1.1 + rng.normal(0, 1, n)
+    i_d = -np.abs(motor_speed) / 30 + rng.normal(0, 1, n)
+    u_q = motor_speed / 50 + i_q * 0.05 + rng.normal(0, 0.5, n)
+    u_d = -i_q * 0.3 + i_d * 0.02 + rng.normal(0, 0.5, n)
+
+    coolant = rng.uniform(18, 70) + np.cumsum(rng.normal(0, 0.01, n))
+    ambient = rng.uniform(20, 28) + np.cumsum(rng.normal(0, 0.002, n))
+    losses = (i_d ** 2 + i_q ** 2) / 1000 + np.abs(motor_speed) / 200 # perdidas electricas y mecanicas
+    stator_winding = coolant + _moving_average(losses, 600) * 2.0 + rng.normal(0, 0.3, n)
+    stator_tooth = coolant + _moving_average(losses, 900) * 1.6 + rng.normal(0, 0.3, n)
+    stator_yoke = coolant + _moving_average(losses, 1200) * 1.2 + rng.normal(0, 0.3, n)
+    pm = coolant + _moving_average(losses, 2400) * 1.4 + rng.normal(0, 0.3, n) # rotor: la respuesta mas lenta
+
+    return {
+        'u_q': u_q, 'coolant': coolant, 'stator_winding': stator_winding, 'u_d': u_d,
+        'stator_tooth': stator_tooth, 'motor_speed': motor_speed, 'i_d': i_d, 'i_q': i_q,
+        'pm': pm, 'stator_yoke': stator_yoke, 'ambient': ambient, 'torque': torque,
+    }
+
+
+def iter_synthetic_chunks(n_rows: int, chunk_rows: int = DEFAULT_CHUNK_ROWS, null_fraction: float = DEFAULT_NULL_FRACTION,
+                          seed: int = 0, first_profile_id: int = 1):
+    """
+    generar datos sinteticos con el esquema del motor por bloques de sesiones completas.
+
+    args:
+        n_rows (int): filas totales a generar.
+        chunk_rows (int): filas aproximadas por bloque (cada bloque contiene sesiones completas).
+        null_fraction (float): fraccion de filas con un valor nulo inyectado.
+        seed (int): semilla para resultados reproducibles.
+        first_profile_id (int): primer profile_id a usar.
+
+    yields:
+        pd.DataFrame: bloques con las 13 columnas del dataset e indice global continuo.
+    """
+    rng = np.random.default_rng(seed)
+    lengths = _profile_lengths(rng, n_rows)
+    profile_ids = first_profile_id + rng.permutation(len(lengths)) # ids sin orden, como en el original
+    start = 0
+    pending = []
+    pending_rows = 0
+
+    def build_chunk(profiles, start):
+        data = {col: [] for col in SENSOR_COLUMNS}
+        ids = []
+        for profile_id, length in profiles:
+            profile = _generate_profile(rng, length)
+            for col in SENSOR_COLUMNS:
+                data[col].append(profile[col].astype(np.float32))
+            ids.append(np.full(length, profile_id, dtype=np.float32))
+        chunk = pd.DataFrame({col: np.concatenate(data[col]) for col in SENSOR_COLUMNS})
+        chunk['profile_id'] = np.concatenate(ids)
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+
+        # inyectar nulos en posiciones y columnas aleatorias
+        n_nulls = rng.binomial(len(chunk), null_fraction)
+        if n_nulls:
+            rows = rng.integers(0, len(chunk), n_nulls)
+            cols = rng.integers(0, len(MOTOR_COLUMNS), n_nulls)
+            for col_position in np.unique(cols): # asignar columna por columna, sin copiar el bloque
+                column = MOTOR_COLUMNS[col_position]
+                chunk.loc[chunk.index[rows[cols == col_position]], column] = np.nan
+        return chunk[MOTOR_COLUMNS]
+
+    for profile_id, length in zip(profile_ids, lengths):
+        pending.append((profile_id, length))
+        pending_rows += length
+        if pending_rows >= chunk_rows:
+            yield build_chunk(pending, start)
+            start += pending_rows
+            pending, pending_rows = [], 0
+    if pending:
+        yield build_chunk(pending, start)
+
+
+def generate_motor_data(n_rows: int, null_fraction: float = DEFAULT_NULL_FRACTION, seed: int = 0) -> pd.DataFrame:
+    """
+    generar un dataframe sintetico en memoria con el esquema del motor.
+
+    args:
+        n_rows (int): filas a generar.
+        null_fraction (float): fraccion de filas con un valor nulo inyectado.
+        seed (int): semilla para resultados reproducibles.
+
+    returns:
+        pd.DataFrame: datos sinteticos crudos (antes de limpiar).
+    """
+    return pd.concat(list(iter_synthetic_chunks(n_rows, null_fraction=null_fraction, seed=seed)))
+
+
+def write_synthetic_csv(file_path: str, n_rows: int, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                        null_fraction: float = DEFAULT_NULL_FRACTION, seed: int = 0) -> str:
+    """
+    escribir csv sintetico por bloques, con memoria acotada aun para cientos de millones de filas.
+
+    args:
+        file_path (str): ruta del csv de salida.
+        n_rows (int): filas a generar.
+        chunk_rows (int): filas aproximadas por bloque.
+        null_fraction (float): fraccion de filas con un valor nulo inyectado.
+        seed (int): semilla para resultados reproducibles.
+
+    returns:
+        str: ruta del archivo escrito.
+    """
+    chunks = iter_synthetic_chunks(n_rows, chunk_rows, null_fraction, seed)
+    if pa_csv is not None:
+        # el escritor de pyarrow es varias veces mas rapido que to_csv para archivos grandes
+        with open(file_path, 'wb') as handle:
+            for i, chunk in enumerate(chunks):
+                options = pa_csv.WriteOptions(include_header=(i == 0))
+                pa_csv.write_csv(pa.Table.from_pandas(chunk, preserve_index=False), handle, write_options=options)
+    else:
+        with open(file_path, 'w', newline='', encoding='utf-8') as handle:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(handle, index=False, header=(i == 0), float_format='%.6g')
+    print(f"dataset sintetico de {n_rows} filas escribir en '{file_path}'.")
+    return file_path
@@ -0,0 +1,46 @@
+import numpy as np
+
+from data_loader import load_data_typed
+from data_cleaner import clean_and_prepare_data
+from profile_store import ProfileStore
+from correlation_engine import (CorrelationAccumulator, accumulate_correlations, compute_correlation_matrix,
+                                compute_profile_correlations, correlation_columns)
+
+
+def test_correlation_matches_pandas(synthetic_csv, reference_clean):
+    df = clean_and_prepare_data(load_data_typed(synthetic_csv))
+    columns = correlation_columns(reference_clean)
+    expected = reference_clean[columns].astype(np.float64).corr()
+    result = compute_correlation_matrix(ProfileStore.from_dataframe(df))
+    np.testing.assert_allclose(result.loc[columns, columns].to_numpy(), expected.to_numpy(), atol=1e-6)
+
+
+def test_profile_correlations_match_pandas(reference_clean):
+    columns = correlation_columns(reference_clean)
+    total, per_profile = compute_profile_correlations(reference_clean, columns=columns)
+    for profile_id, df_profile in reference_clean.groupby('profile_id'):
+        expected = df_profile[columns].corr()
+        np.testing.assert_allclose(per_profile[profile_id].to_numpy(), expected.to_numpy(), atol=1e-9)
+    np.testing.assert_allclose(total.to_numpy(), reference_clean[columns].corr().to_numpy(), atol=1e-9)
+
+
+def test_merged_accumulators_match_single_pass(reference_clean):
+    columns = correlation_columns(reference_clean)
+    single, _ = accumulate_correlations(reference_clean, columns=columns)
+    parts = np.array_split(np.arange(len(reference_clean)), 7) # bloques de distinto tamaño, en otro orden
+    merged = CorrelationAccumulator(columns)
+    for rows in reversed(parts):
+        merged.merge(CorrelationAccumulator(columns).update(reference_clean.iloc[rows]))
+    assert merged.n == single.n
+    np.testing.assert_allclose(merged.correlation().to_numpy(), single.correlation().to_numpy(), atol=1e-12)
+    np.testing.assert_allclose(merged.covariance().to_numpy(), reference_clean[columns].cov().to_numpy(),
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_subtract_inverts_merge(reference_clean):
+    columns = correlation_columns(reference_clean)
+    total, per_profile = accumulate_correlations(reference_clean, columns=columns, by_profile=True)
+    profile_id = next(iter(per_profile))
+    rest = total.subtract(per_profile[profile_id])
+    expected = reference_clean[reference_clean['profile_id'] != profile_id][columns].corr()
+    np.testing.assert_allclose(rest.correlation().to_numpy(), expected.to_numpy(), atol=1e-9)
@@ -0,0 +1,42 @@
+import os
+
+from synthetic_data import write_synthetic_csv
+from data_cache import FEATURE_CACHE_SUBDIR, list_cache_entries
+from feature_engine import load_features_cached
+
+ROWS = 6_000
+
+
+def _feature_entries(cache_dir):
+    root = os.path.join(cache_dir, FEATURE_CACHE_SUBDIR)
+    return sorted(os.listdir(root)) if os.path.isdir(root) else []
+
+
+def test_changed_csv_removes_stale_features(tmp_path):
+    csv_path = str(tmp_path / 'motor.csv')
+    cache_dir = str(tmp_path / 'cache')
+    write_synthetic_csv(csv_path, ROWS, null_fraction=0.0, seed=0)
+    load_features_cached(csv_path, cache_dir=cache_dir)
+    stale = _feature_entries(cache_dir)
+    assert len(stale) == 1
+
+    write_synthetic_csv(csv_path, ROWS + 500, null_fraction=0.0, seed=1) # otro contenido y tamaño
+    features, _, store = load_features_cached(csv_path, cache_dir=cache_dir)
+    assert len(features) == len(store.data) == ROWS + 500
+    current = _feature_entries(cache_dir)
+    assert len(current) == 1 and current != stale
+    assert len(list_cache_entries(cache_dir)) == 1
+
+
+def test_cache_limit_evicts_feature_entries(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    paths = [str(tmp_path / f'motor_{seed}.csv') for seed in range(2)]
+    for seed, csv_path in enumerate(paths):
+        write_synthetic_csv(csv_path, ROWS, null_fraction=0.0, seed=seed)
+
+    load_features_cached(paths[0], cache_dir=cache_dir)
+    first = _feature_entries(cache_dir)
+    load_features_cached(paths[1], cache_dir=cache_dir, max_cache_bytes=0)
+    remaining = _feature_entries(cache_dir)
+    assert len(remaining) == 1 and remaining != first # solo queda la matriz recien creada
+    assert list_cache_entries(cache_dir) == []
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import SENSOR_COLUMNS, load_data_chunks, load_data_typed
+from data_cleaner import clean_and_prepare_data, clean_and_prepare_chunks
+
+
+def _assert_matches_reference(df: pd.DataFrame, reference: pd.DataFrame):
+    assert len(df) == len(reference)
+    np.testing.assert_array_equal(df.index.to_numpy(), reference.index.to_numpy())
+    np.testing.assert_array_equal(df['profile_id'].to_numpy(dtype=np.int64), reference['profile_id'].to_numpy(dtype=np.int64))
+    np.testing.assert_array_equal(df['Tiempo_Segundos'].to_numpy(), reference['Tiempo_Segundos'].to_numpy())
+    np.testing.assert_allclose(df[SENSOR_COLUMNS].to_numpy(dtype=np.float64),
+                               reference[SENSOR_COLUMNS].to_numpy(dtype=np.float64), rtol=1e-6, atol=1e-5)
+
+
+def test_clean_matches_pandas(synthetic_csv, reference_clean):
+    _assert_matches_reference(clean_and_prepare_data(load_data_typed(synthetic_csv)), reference_clean)
+
+
+@pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+def test_streaming_clean_matches_in_memory(synthetic_csv, reference_clean, engine):
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    chunks = clean_and_prepare_chunks(load_data_chunks(synthetic_csv, chunksize=7_000, engine=engine))
+    _assert_matches_reference(pd.concat(list(chunks)), reference_clean)
+
+
+def test_streaming_clean_resumes_counters(synthetic_csv, reference_clean):
+    chunks = list(load_data_chunks(synthetic_csv, chunksize=10_000, engine='c'))
+    counters = {}
+    first = list(clean_and_prepare_chunks(chunks[:5], counters))
+    rest = list(clean_and_prepare_chunks(chunks[5:], counters)) # reanudar con los contadores previos
+    _assert_matches_reference(pd.concat(first + rest), reference_clean)
@@ -0,0 +1,72 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import fleet_analysis
+from synthetic_data import write_synthetic_csv
+from data_cleaner import clean_and_prepare_data
+from data_loader import load_data_typed
+from data_exporter import export_powerbi_stream
+
+pytest.importorskip('pyarrow') # la exportacion por particiones requiere pyarrow
+
+ROWS_PER_MOTOR = 6_000
+_ANALYZE_MOTOR_FILE = fleet_analysis.analyze_motor_file
+
+
+def _analyze_or_crash(file_path, motor, *args):
+    """
+    reemplazo del trabajador que mata su proceso con el motor 'caido'; los demas esperan para
+    seguir en curso cuando el pool se rompe.
+    """
+    if motor == 'caido':
+        os._exit(1)
+    time.sleep(0.5)
+    return _ANALYZE_MOTOR_FILE(file_path, motor, *args)
+
+
+@pytest.fixture
+def fleet_dir(tmp_path):
+    folder = tmp_path / 'flota'
+    folder.mkdir()
+    for seed, motor in enumerate(['m1', 'm2']):
+        write_synthetic_csv(str(folder / f'{motor}.csv'), ROWS_PER_MOTOR, null_fraction=0.0, seed=seed)
+    return folder
+
+
+def test_partitioned_export_reads_back(tmp_path):
+    csv_path = str(tmp_path / 'motor.csv')
+    write_synthetic_csv(csv_path, ROWS_PER_MOTOR, null_fraction=0.0, seed=7)
+    df = clean_and_prepare_data(load_data_typed(csv_path))
+    output_dir = str(tmp_path / 'powerbi')
+    export_powerbi_stream(df, output_dir, row_group_size=1_000, chunk_rows=2_500)
+
+    back = pd.read_parquet(output_dir)
+    assert len(back) == len(df)
+    sizes = back.groupby('id_sesion_prueba', observed=True).size()
+    expected = df.groupby('profile_id').size()
+    assert sorted(sizes.to_dict().items()) == sorted(expected.to_dict().items())
+
+
+def test_fleet_parquet_export_reads_back(fleet_dir, tmp_path):
+    export_dir = str(tmp_path / 'powerbi_flota')
+    fleet = fleet_analysis.run_fleet_analysis(str(fleet_dir), export_dir=export_dir, workers=2)
+    assert fleet['errors'] == {}
+
+    back = pd.read_parquet(export_dir)
+    assert len(back) == 2 * ROWS_PER_MOTOR
+    assert set(back['motor'].astype(str)) == {'m1', 'm2'}
+    sessions = back.groupby(['motor', 'id_sesion_prueba'], observed=True).size()
+    assert len(sessions) == len(fleet['summary'])
+
+
+def test_fleet_survives_dead_worker(fleet_dir, tmp_path, monkeypatch):
+    write_synthetic_csv(str(fleet_dir / 'caido.csv'), ROWS_PER_MOTOR, null_fraction=0.0, seed=9)
+    monkeypatch.setattr(fleet_analysis, 'analyze_motor_file', _analyze_or_crash)
+
+    fleet = fleet_analysis.run_fleet_analysis(str(fleet_dir), workers=2)
+    assert fleet['motors'] == ['m1', 'm2']
+    assert list(fleet['errors']) == ['caido']
+    assert 'BrokenProcessPool' in fleet['errors']['caido']
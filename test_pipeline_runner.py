@@ -0,0 +1,76 @@
+import os
+
+import time
+
+import numpy as np
+import pytest
+
+import instrumentation
+from pipeline_runner import PipelineRunner
+
+
+def _scaled(values, factor):
+    return values * factor
+
+
+def _total(values):
+    return float(values.sum())
+
+
+def _slow_sum(values, seconds):
+    time.sleep(seconds) # mantener la etapa abierta para que se superponga con las demas
+    return float(np.square(values).sum())
+
+
+@pytest.fixture
+def memory_tracking():
+    instrumentation.reset()
+    instrumentation.enable(track_memory=True)
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def _build_runner(cache_dir, factor, **options):
+    runner = PipelineRunner(cache_dir=str(cache_dir), **options)
+    runner.add_stage('datos', np.arange, params={'stop': 50_000, 'dtype': np.float64})
+    runner.add_stage('escalar', _scaled, inputs=['datos'], params={'factor': factor})
+    runner.add_stage('total', _total, inputs=['escalar'])
+    return runner
+
+
+def test_new_key_prunes_previous_stage_results(tmp_path):
+    _build_runner(tmp_path, 2).run()
+    assert len(os.listdir(tmp_path)) == 3
+
+    results = _build_runner(tmp_path, 3).run()
+    assert results['total'] == 3 * sum(range(50_000))
+    names = sorted(filename.rsplit('-', 1)[0] for filename in os.listdir(tmp_path))
+    assert names == ['datos', 'escalar', 'total'] # una sola clave por etapa
+
+
+def test_cache_size_limit_evicts_least_recent(tmp_path):
+    runner = _build_runner(tmp_path, 2, max_cache_bytes=0)
+    keys = runner.stage_keys()
+    runner.run()
+    kept = set(os.listdir(tmp_path))
+    assert kept == {os.path.basename(runner._cache_path(name, key)) for name, key in keys.items()}
+
+    other = PipelineRunner(cache_dir=str(tmp_path), max_cache_bytes=0)
+    other.add_stage('otra', np.ones, params={'shape': 10})
+    other.run()
+    assert os.listdir(tmp_path) == [os.path.basename(other._cache_path('otra', other.stage_keys()['otra']))]
+
+
+def test_memory_tracking_reports_every_stage_peak(tmp_path, memory_tracking):
+    runner = PipelineRunner(cache_dir=str(tmp_path))
+    runner.add_stage('datos', np.arange, params={'stop': 200_000, 'dtype': np.float64})
+    for branch in range(3): # ramas independientes que el pool de hilos correria a la vez
+        runner.add_stage(f'rama_{branch}', _slow_sum, inputs=['datos'], params={'seconds': 0.2})
+    runner.run()
+
+    records = [r for r in instrumentation.get_records() if r['name'].startswith('pipeline.')]
+    assert sorted(r['name'] for r in records) == sorted(f'pipeline.{name}' for name in runner.stages)
+    assert all(r['peak_memory_bytes'] is not None and not r['memory_overlapped'] for r in records)
+    assert records[0]['name'] == 'pipeline.datos'
+    assert records[0]['peak_memory_bytes'] >= 200_000 * 8 # el arreglo de la etapa cuenta en su pico
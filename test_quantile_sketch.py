@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from profile_store import iter_batches
+from quantile_sketch import (DEFAULT_PERCENTILES, QuantileSketch, accumulate_describe, accumulate_describe_chunks,
+                             rank_error_bound)
+
+EXACT_STATISTICS = ['count', 'mean', 'std', 'min', 'max']
+K = 200
+
+
+def _assert_rank_within_bound(values, estimate, q, bound):
+    """
+    el percentil estimado debe ocupar en los datos un rango a menos de bound de q (los empates
+    ocupan todo su intervalo de rangos).
+    """
+    ordered = np.sort(values)
+    below = np.searchsorted(ordered, estimate, side='left') / len(ordered)
+    at_or_below = np.searchsorted(ordered, estimate, side='right') / len(ordered)
+    assert below - bound <= q <= at_or_below + bound
+
+
+@pytest.fixture(scope='module')
+def sensors(reference_clean):
+    return reference_clean.drop(columns=['profile_id', 'Tiempo_Segundos'])
+
+
+def test_exact_statistics_match_describe(sensors):
+    total, _ = accumulate_describe(sensors, k=K, batch_rows=7_000)
+    expected = sensors.describe().T
+    np.testing.assert_allclose(total.describe()[EXACT_STATISTICS], expected[EXACT_STATISTICS], rtol=1e-9)
+
+
+def test_quantiles_within_rank_error_bound(sensors):
+    total, _ = accumulate_describe(sensors, k=K, batch_rows=7_000)
+    table = total.describe()
+    bound = rank_error_bound(K)
+    for col in sensors.columns:
+        for q in DEFAULT_PERCENTILES:
+            _assert_rank_within_bound(sensors[col].to_numpy(), table.loc[col, f'{q * 100:g}%'], q, bound)
+
+
+def test_quantiles_with_ties_within_bound():
+    values = np.repeat(np.arange(20, dtype=np.float64), 5_000) # 20 valores repetidos
+    sketch = QuantileSketch(K, seed=0)
+    for batch in np.array_split(np.random.default_rng(0).permutation(values), 13):
+        sketch.update(batch)
+    for q, estimate in zip(DEFAULT_PERCENTILES, sketch.quantiles(DEFAULT_PERCENTILES)):
+        _assert_rank_within_bound(values, estimate, q, rank_error_bound(K))
+
+
+def test_small_input_is_exact(sensors):
+    sample = sensors.iloc[:K // 2]
+    total, _ = accumulate_describe(sample, k=K)
+    np.testing.assert_allclose(total.describe().to_numpy(), sample.describe().T.to_numpy(), rtol=1e-9)
+
+
+def test_chunked_profiles_match_in_memory(reference_clean):
+    columns = ['pm', 'torque']
+    in_memory, per_profile = accumulate_describe(reference_clean, columns=columns, by_profile=True, k=K)
+    chunked, per_chunk = accumulate_describe_chunks(iter_batches(reference_clean, 7_000), columns=columns,
+                                                    by_profile=True, k=K)
+    assert sorted(per_chunk) == sorted(per_profile)
+    np.testing.assert_allclose(chunked.describe()[EXACT_STATISTICS], in_memory.describe()[EXACT_STATISTICS],
+                               rtol=1e-9)
+    expected = reference_clean.groupby('profile_id')[columns].describe()
+    for profile_id, sketch in per_chunk.items():
+        table = sketch.describe()
+        for col in columns:
+            np.testing.assert_allclose(table.loc[col, EXACT_STATISTICS].to_numpy(dtype=float),
+                                       expected.loc[profile_id, col][EXACT_STATISTICS].to_numpy(dtype=float),
+                                       rtol=1e-9)
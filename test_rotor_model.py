@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from profile_store import ProfileStore
+from feature_engine import FEATURE_COLUMNS
+from rotor_model import (RotorTemperatureModel, TARGET_COLUMN, accumulate_chunks, accumulate_profiles,
+                         leave_one_profile_out, merge_accumulators)
+
+ALPHA = 0.01
+
+
+def _design(df):
+    return df[FEATURE_COLUMNS].to_numpy(dtype=np.float64), df[TARGET_COLUMN].to_numpy(dtype=np.float64)
+
+
+def _direct_ridge(x, y, alpha):
+    """
+    ridge sobre variables estandarizadas resuelto directamente sobre las filas.
+    """
+    mean_x, mean_y = x.mean(axis=0), y.mean()
+    scale = x.std(axis=0)
+    scaled = (x - mean_x) / scale
+    system = scaled.T @ scaled / len(x) + alpha * np.eye(x.shape[1])
+    coef = np.linalg.solve(system, scaled.T @ (y - mean_y) / len(x)) / scale
+    return coef, mean_y - mean_x @ coef
+
+
+@pytest.fixture(scope='module')
+def per_profile(reference_clean):
+    return accumulate_chunks([reference_clean])
+
+
+def test_unpenalized_fit_matches_lstsq(reference_clean, per_profile):
+    model = RotorTemperatureModel.from_accumulator(merge_accumulators(per_profile.values()), alpha=0.0)
+    x, y = _design(reference_clean)
+    solution = np.linalg.lstsq(np.column_stack([np.ones(len(x)), x]), y, rcond=None)[0]
+    np.testing.assert_allclose(model.intercept, solution[0], rtol=1e-6)
+    np.testing.assert_allclose(model.coef, solution[1:], rtol=1e-5, atol=1e-9)
+
+
+def test_chunked_accumulation_matches_matrix(reference_clean, per_profile):
+    store = ProfileStore.from_dataframe(reference_clean)
+    x, y = _design(store.data)
+    from_matrix = accumulate_profiles(x, y, store, FEATURE_COLUMNS, batch_rows=5_000)
+    assert sorted(from_matrix) == sorted(per_profile)
+    for profile_id, accumulator in from_matrix.items():
+        assert accumulator.n == per_profile[profile_id].n
+        np.testing.assert_allclose(accumulator.comoment, per_profile[profile_id].comoment, rtol=1e-8, atol=1e-6)
+
+
+def test_leave_one_profile_out_matches_direct_fit(reference_clean, per_profile):
+    best, report, scores = leave_one_profile_out(per_profile, alphas=(ALPHA,))
+    assert best == ALPHA
+    for profile_id, row in report.iterrows():
+        held_out = reference_clean['profile_id'] == profile_id
+        coef, intercept = _direct_ridge(*_design(reference_clean[~held_out]), ALPHA)
+        x, y = _design(reference_clean[held_out])
+        error = y - (x @ coef + intercept)
+        np.testing.assert_allclose(row['rmse'], np.sqrt(np.mean(error ** 2)), rtol=1e-6)
+        np.testing.assert_allclose(row['sesgo'], error.mean(), rtol=1e-5, atol=1e-6)
+    total_error = np.sqrt((report['rmse'] ** 2 * report['filas']).sum() / report['filas'].sum())
+    np.testing.assert_allclose(scores[ALPHA], total_error, rtol=1e-9)